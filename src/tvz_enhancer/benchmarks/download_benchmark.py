@@ -0,0 +1,109 @@
+"""
+Measures download throughput against a local HTTP stand-in for moj.tvz.hr,
+comparing the previous iter_content loop (8 KiB chunks, and again at the
+chosen chunk size) with the preallocated writer used by the DownloadManager,
+with and without hashing while streaming.
+
+    python -m src.tvz_enhancer.benchmarks.download_benchmark [--size-mb N] [--repeat N] [--chunk-size B]
+"""
+import argparse
+import hashlib
+import http.server
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from src.tvz_enhancer.data.download_writer import PreallocatedWriter
+
+# The chunk size of the iter_content loop the DownloadManager used before the preallocated writer.
+BASELINE_CHUNK_SIZE = 8192
+
+
+class _FileHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        view = memoryview(self.body)
+        for start in range(0, len(view), 1024 * 1024):
+            self.wfile.write(view[start:start + 1024 * 1024])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(body):
+    _FileHandler.body = body
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/file"
+
+
+def download_iter_content(session, url, path, chunk_size):
+    with session.get(url, stream=True) as response, open(path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                f.write(chunk)
+
+
+def download_writer(session, url, path, chunk_size, hashed=False):
+    headers = {'Accept-Encoding': 'identity'}
+    with session.get(url, stream=True, headers=headers) as response:
+        total = int(response.headers.get('Content-Length', 0))
+        hasher = hashlib.sha256() if hashed else None
+        with PreallocatedWriter(path, 0, total, hasher, min_chunk=chunk_size) as writer:
+            for _ in writer.stream(response):
+                pass
+
+
+def best_throughput(download, size, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        download()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return size / best / (1024 * 1024)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the download writer against a local server.")
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    args = parser.parse_args(argv)
+
+    body = os.urandom(args.size_mb * 1024 * 1024)
+    server, url = serve(body)
+    session = requests.Session()
+    fd, path = tempfile.mkstemp(prefix="tvz-download-benchmark-")
+    os.close(fd)
+
+    runs = [
+        ("iter_content 8 KiB (before)", lambda: download_iter_content(session, url, path, BASELINE_CHUNK_SIZE)),
+        (f"iter_content {args.chunk_size // 1024} KiB",
+         lambda: download_iter_content(session, url, path, args.chunk_size)),
+        ("preallocated writer", lambda: download_writer(session, url, path, args.chunk_size)),
+        ("preallocated + sha256", lambda: download_writer(session, url, path, args.chunk_size, hashed=True)),
+    ]
+    try:
+        print(f"{args.size_mb} MiB, best of {args.repeat}")
+        for name, download in runs:
+            throughput = best_throughput(download, len(body), args.repeat)
+            if os.path.getsize(path) != len(body):
+                raise IOError(f"{name} wrote {os.path.getsize(path)} of {len(body)} bytes")
+            print(f"  {name:<28} {throughput:8.1f} MiB/s")
+    finally:
+        server.shutdown()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares the available HTML parser backends on recorded moj.tvz.hr pages,
+with and without region-restricted (SoupStrainer) parsing, and the
+incremental stream parser including its time to the first extracted item.
+
+    python -m src.tvz_enhancer.benchmarks.parser_benchmark [page.html | dir ...] [--repeat N] [--chunk-size B]
+
+Without arguments the synthetic course page in pages/ is used (8 sections,
+800 files, 12 notifications). Save a course page from the browser ("Save
+page as... HTML only") to benchmark real data.
+"""
+import argparse
+import os
+import time
+
+from src.tvz_enhancer.data import html_parser, stream_parser
+
+DEFAULT_PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+
+def collect_pages(paths):
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                full_path = os.path.join(path, filename)
+                if os.path.isfile(full_path):
+                    pages.append(full_path)
+        elif os.path.isfile(path):
+            pages.append(path)
+    return pages
+
+
+def time_parse(markup, backend, parse_only, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        soup = html_parser.make_soup(markup, parse_only=parse_only, backend=backend)
+        soup.select('div.card-header')
+        soup.select('div.col-sm-3 div.shadow.p-3.mb-5.rounded')
+        soup.find_all('a', class_='nav-link mojtvzlink', onclick=True)
+    return (time.perf_counter() - start) / repeat
+
+
+def time_stream(content, chunk_size, repeat):
+    """Returns (seconds to the first item, seconds for the whole page), averaged over repeat runs."""
+    first_total = 0.0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run_start = time.perf_counter()
+        first = None
+        chunks = (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+        for _ in stream_parser.iter_course_page(chunks, "utf-8"):
+            if first is None:
+                first = time.perf_counter() - run_start
+        first_total += first if first is not None else time.perf_counter() - run_start
+    return first_total / repeat, (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on recorded pages.")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_PAGES_DIR])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=16384)
+    args = parser.parse_args(argv)
+
+    pages = collect_pages(args.paths)
+    if not pages:
+        print("No pages found.")
+        return
+
+    backends = html_parser.available_backends()
+    print(f"Backends: {', '.join(backends)} (default: {html_parser.DEFAULT_BACKEND})")
+
+    for page in pages:
+        with open(page, "rb") as f:
+            content = f.read()
+        markup = content.decode("utf-8", errors="replace")
+
+        print(f"\n{os.path.basename(page)} ({len(markup) / 1024:.0f} KiB)")
+        for backend in backends:
+            full = time_parse(markup, backend, None, args.repeat)
+            strained = time_parse(markup, backend, html_parser.COURSE_PAGE, args.repeat)
+            print(f"  {backend:<12} full {full * 1000:8.2f} ms   strained {strained * 1000:8.2f} ms")
+
+        first, total = time_stream(content, args.chunk_size, args.repeat)
+        print(f"  {'stream':<12} full {total * 1000:8.2f} ms   first item {first * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
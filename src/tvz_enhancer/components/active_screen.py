@@ -65,6 +65,11 @@ class ActiveScreen(QWidget):
         self.reservation_button.clicked.connect(self.handle_reservation_button)
         self.top_bar_layout.addWidget(self.reservation_button, alignment=Qt.AlignmentFlag.AlignRight)
 
+        self.connection_label = QLabel()
+        self.connection_label.setStyleSheet("color: #FFA500; font-size: 13px;")
+        self.connection_label.hide()
+        self.top_bar_layout.addWidget(self.connection_label, alignment=Qt.AlignmentFlag.AlignRight)
+
         self.top_bar_widget = QWidget()
         self.top_bar_widget.setStyleSheet("background-color: transparent;")
         self.top_bar_widget.setLayout(self.top_bar_layout)
@@ -81,6 +86,17 @@ class ActiveScreen(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(layout)
 
+    def set_connection_state(self, state):
+        messages = {
+            "open": "moj.tvz.hr nije dostupan, osvježavanje je pauzirano",
+            "half_open": "Ponovno spajanje na moj.tvz.hr..."
+        }
+        if state in messages:
+            self.connection_label.setText(messages[state])
+            self.connection_label.show()
+        else:
+            self.connection_label.hide()
+
     def handle_reservation_button(self):
         current_widget = self.scene_stack.currentWidget()
         if isinstance(current_widget, ReservationModule):
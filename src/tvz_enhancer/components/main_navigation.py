@@ -6,6 +6,8 @@ import os
 
 from src.tvz_enhancer.components.logout_button import LogoutButton
 from src.tvz_enhancer.data.course import Course
+from src.tvz_enhancer.data.session_provider import SessionProvider
+from src.tvz_enhancer.data.snapshot import clear_snapshot
 from src.tvz_enhancer.modules.calendar_module import CalendarModule
 from src.tvz_enhancer.modules.home_module import HomeModule
 from src.tvz_enhancer.modules.notification_module import NotificationModule
@@ -137,20 +139,21 @@ class NavButton(QWidget):
         painter.drawText(text_x, text_y, self.text)
 
 class MainNavigation(QWidget):
-    def __init__(self, activeScreen, app_manager = None, student_name = None, parent=None):
+    def __init__(self, activeScreen, app_manager = None, student_name = None, data_api=None, parent=None):
         super().__init__(parent)
         self.student_name = student_name
         self.activeScreen = activeScreen
         self.button_frames = []
         self.current_selected_button = None
         self.app_manager = app_manager
+        self.data_api = data_api
         self.notification_module = NotificationModule()
         self.home_module = HomeModule()
 
         self.home_module.set_notification_module(self.notification_module)
         self.notification_module.home_module = self.home_module
         self.calendar_module = CalendarModule()
-        self.document_module = DocumentModule()
+        self.document_module = DocumentModule(data_api)
         self.reservation_module = ReservationModule()
         self.init_ui()
 
@@ -238,6 +241,11 @@ class MainNavigation(QWidget):
             self.activeScreen.swapModule(module)
             self.activeScreen.top_bar.setText(title)
 
+    def set_student_name(self, student_name):
+        self.student_name = student_name
+        if self.activeScreen.scene_stack.currentWidget() is self.home_module:
+            self.activeScreen.top_bar.setText(f"Pozdrav, {self.student_name}")
+
     def handleLogout(self, clicked_button, clicked_frame):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         cookies_file_path = os.path.normpath(os.path.join(current_dir, '..', 'cookies.json'))
@@ -248,6 +256,13 @@ class MainNavigation(QWidget):
         except Exception as e:
             print(f"Dogodila se greška prilikom brisanja sadržaja: {e}")
 
+        if self.data_api:
+            self.data_api.stop()
+            # A cycle still in flight would otherwise write the snapshot back after it was cleared.
+            self.data_api.wait()
+        clear_snapshot()
+        SessionProvider.instance().reset()
+
         self.app_manager.switch_to("login")
 
 
@@ -9,6 +9,7 @@ from PyQt6.QtWidgets import QApplication
 from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEngineCookieStore
 from PyQt6.QtCore import QDateTime
 
+from src.tvz_enhancer.data.session_provider import SessionProvider
 from src.tvz_enhancer.utils.cookie_manager import CookieManager
 
 
@@ -57,7 +58,7 @@ class SSOLoginWindow(QMainWindow):
 
     def getSOOLoginUrl(self):
         try:
-            session = requests.Session()
+            session = SessionProvider.instance().handle("login")
             response = session.get(self.url, timeout=10)
             response.raise_for_status()
 
@@ -105,10 +106,13 @@ class SSOLoginWindow(QMainWindow):
     def check_for_redirect(self, new_url):
         if new_url.toString().startswith(
                 "https://moj.tvz.hr/index.php?state="):
+            # The session is read from cookies.json right after this signal.
+            self.cookie_manager.flush()
             self.login_completed.emit(True)
             self.close()
 
     def closeEvent(self, event):
+        self.cookie_manager.flush()
         self.login_canceled.emit(True)
         event.accept()
 
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'file_cache')
+INDEX_VERSION = 1
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobCache:
+    """
+    Local copies of downloaded course files. Blobs are stored once per content
+    hash; the index maps a key (the file's repository id) to a blob together
+    with its version (the scraped date) and HTTP validators. The least
+    recently used entries are evicted once the blobs exceed max_bytes.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = 512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, "index.json")
+        self._entries = None
+        self._lock = threading.RLock()
+
+    def lookup(self, key: str, version=None, touch: bool = True):
+        """Returns the entry for key, or None if it is missing, stale or its blob is gone."""
+        with self._lock:
+            entry = self._index().get(key)
+            if entry is None:
+                return None
+            if version is not None and entry.get('version') != version:
+                return None
+            if not os.path.exists(self._blob_path(entry['blob'])):
+                self._drop(key)
+                return None
+
+            if touch:
+                entry['last_access'] = time.time()
+                self._save()
+            return dict(entry, path=self._blob_path(entry['blob']))
+
+    def path(self, key: str, version=None):
+        entry = self.lookup(key, version)
+        return entry['path'] if entry else None
+
+    def request_headers(self, key: str, version=None) -> dict:
+        """Conditional request headers to revalidate the cached copy of key."""
+        entry = self.lookup(key, version, touch=False)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def staging_path(self, key: str) -> str:
+        """A scratch location for downloading straight into the cache, see store(move=True)."""
+        os.makedirs(os.path.join(self.root, "staging"), exist_ok=True)
+        return os.path.join(self.root, "staging", hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def store(self, key: str, path: str, filename: str, version=None, etag=None, last_modified=None,
+              move: bool = False, digest: str = None):
+        """Adds the file at path under key and returns the blob path; identical content is stored once."""
+        try:
+            digest = digest or file_digest(path)
+            blob = digest + os.path.splitext(filename)[1].lower()
+            blob_path = self._blob_path(blob)
+
+            with self._lock:
+                if os.path.exists(blob_path):
+                    if move:
+                        os.remove(path)
+                else:
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    temp_path = blob_path + ".tmp"
+                    if move:
+                        os.replace(path, temp_path)
+                    else:
+                        shutil.copyfile(path, temp_path)
+                    os.replace(temp_path, blob_path)
+
+                entries = self._index()
+                previous = entries.get(key)
+                entries[key] = {
+                    'blob': blob,
+                    'size': os.path.getsize(blob_path),
+                    'filename': filename,
+                    'version': version,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'last_access': time.time()
+                }
+                if previous and previous['blob'] != blob:
+                    self._remove_unreferenced(previous['blob'])
+                self._evict()
+                self._save()
+                return blob_path if key in entries else None
+        except OSError as e:
+            print(f"Error storing file in cache: {e}")
+            return None
+
+    def copy_to(self, key: str, destination: str, version=None) -> bool:
+        entry = self.lookup(key, version)
+        if entry is None:
+            return False
+        try:
+            shutil.copyfile(entry['path'], destination)
+            return True
+        except OSError as e:
+            print(f"Error copying file from cache: {e}")
+            return False
+
+    def total_size(self) -> int:
+        with self._lock:
+            return sum({entry['blob']: entry['size'] for entry in self._index().values()}.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def _blob_path(self, blob):
+        return os.path.join(self.root, "blobs", blob[:2], blob)
+
+    def _index(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    self._entries = data.get("entries", {})
+            except (OSError, json.JSONDecodeError, AttributeError):
+                pass
+        return self._entries
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "entries": self._entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"Error saving cache index: {e}")
+
+    def _drop(self, key):
+        entry = self._index().pop(key, None)
+        if entry:
+            self._remove_unreferenced(entry['blob'])
+        self._save()
+
+    def _remove_unreferenced(self, blob):
+        if any(entry['blob'] == blob for entry in self._index().values()):
+            return
+        try:
+            os.remove(self._blob_path(blob))
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = self._index()
+        blob_sizes = {entry['blob']: entry['size'] for entry in entries.values()}
+        total = sum(blob_sizes.values())
+
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            del entries[key]
+            if not any(other['blob'] == entry['blob'] for other in entries.values()):
+                total -= blob_sizes[entry['blob']]
+                self._remove_unreferenced(entry['blob'])
@@ -7,6 +7,8 @@ import json
 import os
 from pathlib import Path
 
+from src.tvz_enhancer.utils import dates
+
 
 class Course(QObject):
     notificationsChanged = pyqtSignal()
@@ -54,7 +56,7 @@ class Course(QObject):
             self._files.extend(files)
 
         self._notifications.sort(
-            key=lambda x: self._parse_time(x["time"]),
+            key=lambda x: dates.sort_key(x["time"], dates.NOTIFICATION_TIME_FORMAT),
             reverse=True
         )
 
@@ -62,11 +64,7 @@ class Course(QObject):
         logging.debug(f"Total files parsed: {len(self._files)}")
 
     def _parse_time(self, time_str: str) -> datetime.datetime:
-        replaced = time_str.replace(" u ", " ").replace("h", "")
-        try:
-            return datetime.datetime.strptime(replaced, "%d.%m.%Y %H")
-        except ValueError:
-            return datetime.datetime.min
+        return dates.parse(time_str, dates.NOTIFICATION_TIME_FORMAT) or datetime.datetime.min
 
     def add_notification(self, title: str, message: str, time_: str, course: str) -> None:
         new_notif = {
@@ -0,0 +1,189 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+FOLDER = "folder"
+ZIP = "zip"
+
+_UNSAFE_CHARACTERS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def safe_name(name: str) -> str:
+    name = _UNSAFE_CHARACTERS.sub("_", name).strip().rstrip(".")
+    return name or "_"
+
+
+def unique_path(path: str, taken: set) -> str:
+    """Appends " (2)", " (3)"... to path until it is not in taken, then reserves it."""
+    base, extension = os.path.splitext(path)
+    candidate = path
+    counter = 2
+    while candidate.lower() in taken:
+        candidate = f"{base} ({counter}){extension}"
+        counter += 1
+    taken.add(candidate.lower())
+    return candidate
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class CourseExporter:
+    """
+    Downloads every repository file of one or more courses with bounded
+    parallelism, either into a course/section/file folder tree or into a
+    single ZIP archive. Files are streamed in chunks and never held in memory
+    as a whole; for ZIP output each file is spooled to a temporary file by its
+    worker and copied into the archive by the calling thread, because a ZIP
+    can only be written one entry at a time.
+    """
+
+    def __init__(self, executor, url_for, filename_resolver, max_workers: int = 4, chunk_size: int = 65536):
+        self.executor = executor
+        self.url_for = url_for
+        self.filename_resolver = filename_resolver
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.cancelled = threading.Event()
+        self._names_lock = threading.Lock()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def export(self, course_files: dict, target: str, mode: str = FOLDER, progress=None):
+        """
+        course_files maps a course name to its FileRecords. progress(done, total,
+        relative_path, error) is called from the calling thread after every
+        file. Returns (exported, failed).
+        """
+        jobs = [(course_name, file)
+                for course_name, files in course_files.items()
+                for file in files if file.downloadable]
+        if mode == ZIP:
+            return self._export_zip(jobs, target, progress)
+        return self._export_folder(jobs, target, progress)
+
+    def _export_folder(self, jobs, target, progress):
+        taken = set()
+
+        def write(course_name, file):
+            with self._open_response(file) as response:
+                relative_path = self._relative_path(course_name, file, response, taken)
+                path = os.path.join(target, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                try:
+                    with open(path, "wb") as f:
+                        self._copy(response, f)
+                except BaseException:
+                    os.remove(path)
+                    raise
+            return relative_path, None
+
+        return self._run(jobs, write, progress)
+
+    def _export_zip(self, jobs, target, progress):
+        taken = set()
+        spool_dir = os.path.dirname(os.path.abspath(target))
+
+        def spool(course_name, file):
+            with self._open_response(file) as response:
+                relative_path = self._relative_path(course_name, file, response, taken)
+                spooled = tempfile.NamedTemporaryFile(dir=spool_dir, prefix=".export-", delete=False)
+                try:
+                    with spooled:
+                        self._copy(response, spooled)
+                except BaseException:
+                    os.remove(spooled.name)
+                    raise
+            return relative_path, spooled.name
+
+        temp_target = target + ".tmp"
+        try:
+            with zipfile.ZipFile(temp_target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                def add(relative_path, spooled_path):
+                    try:
+                        archive_name = relative_path.replace(os.sep, "/")
+                        with open(spooled_path, "rb") as source, archive.open(archive_name, "w") as entry:
+                            shutil.copyfileobj(source, entry, self.chunk_size)
+                    finally:
+                        os.remove(spooled_path)
+
+                result = self._run(jobs, spool, progress, on_done=add)
+            os.replace(temp_target, target)
+            return result
+        finally:
+            if os.path.exists(temp_target):
+                os.remove(temp_target)
+
+    def _run(self, jobs, fetch, progress, on_done=None):
+        exported = 0
+        failed = 0
+        handled = set()
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="export")
+        futures = {pool.submit(fetch, course_name, file): (course_name, file) for course_name, file in jobs}
+        try:
+            for future in as_completed(futures):
+                handled.add(future)
+                course_name, file = futures[future]
+                error = None
+                relative_path = os.path.join(course_name, file.section, file.name)
+                try:
+                    relative_path, spooled_path = future.result()
+                    if on_done is not None:
+                        on_done(relative_path, spooled_path)
+                    exported += 1
+                except ExportCancelled:
+                    raise
+                except Exception as e:
+                    print(f"Error exporting {relative_path}: {e}")
+                    error = str(e)
+                    failed += 1
+
+                if progress is not None:
+                    progress(exported + failed, len(jobs), relative_path, error)
+                if self.cancelled.is_set():
+                    raise ExportCancelled()
+        except BaseException:
+            self.cancel()
+            pool.shutdown(wait=True, cancel_futures=True)
+            # Files that finished downloading after the export was aborted are spooled but never added.
+            for future in futures:
+                if future not in handled and not future.cancelled() and future.exception() is None:
+                    _, spooled_path = future.result()
+                    if spooled_path and os.path.exists(spooled_path):
+                        os.remove(spooled_path)
+            raise
+        finally:
+            pool.shutdown(wait=False)
+
+        return exported, failed
+
+    def _open_response(self, file):
+        if self.cancelled.is_set():
+            raise ExportCancelled()
+        response = self.executor.get(self.url_for(file.extension), "download", stream=True)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
+
+    def _relative_path(self, course_name, file, response, taken):
+        filename = self.filename_resolver(response, safe_name(file.name))
+        path = os.path.join(safe_name(course_name), safe_name(file.section), safe_name(filename))
+        with self._names_lock:
+            return unique_path(path, taken)
+
+    def _copy(self, response, destination):
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            if self.cancelled.is_set():
+                raise ExportCancelled()
+            if chunk:
+                destination.write(chunk)
@@ -1,309 +1,483 @@
-import json
 import mimetypes
+import multiprocessing
 import os
 import re
 import time
-import requests
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QTimer
-from PyQt6.QtWidgets import QFileDialog, QMessageBox, QLabel, QApplication, QFrame
-from bs4 import BeautifulSoup
-from requests.cookies import create_cookie
-from datetime import datetime
+import threading
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.tvz_enhancer.data import extraction, html_parser, stream_parser
+from src.tvz_enhancer.data.blob_cache import BlobCache
+from src.tvz_enhancer.data.diff_engine import DiffEngine, FILE, NOTIFICATION
+from src.tvz_enhancer.data.download_manager import DownloadManager
+from src.tvz_enhancer.data.poll_scheduler import PollScheduler
+from src.tvz_enhancer.data.prefetch import PrefetchPolicy
+from src.tvz_enhancer.data.request_executor import RequestExecutor, CircuitBreaker
+from src.tvz_enhancer.data.session_provider import SessionProvider
+from src.tvz_enhancer.data.single_flight import SingleFlight
+from src.tvz_enhancer.data.snapshot import load_snapshot, save_snapshot
+from src.tvz_enhancer.data.validator_cache import ValidatorCache
 
 
 class DataApiThread(QThread):
-    notification_updated = pyqtSignal(dict)
-    files_updated = pyqtSignal(dict)
+    changes_updated = pyqtSignal(object)
     first_load_signal = pyqtSignal(bool)
+    connection_state_changed = pyqtSignal(str)
     reservation_links_signal = pyqtSignal(object, object)
+    student_name_changed = pyqtSignal(str)
+    session_expired = pyqtSignal()
 
-    def __init__(self, interval: int = 500):
+    def __init__(self, interval: int = 500, max_workers: int = 6, cycle_budget: float = 60,
+                 use_process_pool: bool = False, streaming: bool = False, stream_chunk_size: int = 16384,
+                 max_downloads: int = 3, prefetch: bool = False):
         super().__init__()
+        self.session_provider = SessionProvider.instance()
         self.session = None
         self.state = None
         self.interval = interval
+        self.max_workers = max_workers
+        self.cycle_budget = cycle_budget
+        self.streaming = streaming
+        self.stream_chunk_size = stream_chunk_size
+        self.executor = RequestExecutor(lambda: self.session,
+                                        CircuitBreaker(on_state_change=self.connection_state_changed.emit))
+        self.blob_cache = BlobCache()
+        self.download_manager = DownloadManager(self.executor, self.determine_filename, max_workers=max_downloads,
+                                                cache=self.blob_cache, url_for=self.download_url)
+        self.prefetch = PrefetchPolicy(self.download_manager, self.blob_cache, self.download_url, enabled=prefetch)
+        self.validator_cache = ValidatorCache()
+        self.single_flight = SingleFlight()
+        self.scheduler = PollScheduler(base_interval=interval)
+        self.reservation_links = {}
+        self._courses = None
+        self._courses_refreshed_at = 0.0
+        self._course_pages = {}
+        # REMOVED events of courses that left the course list, published with the next cycle.
+        self._dropped_events = []
+        self._links_dropped = False
         self._is_running = True
-        self.current_files = {}
-        self.current_notifications = {}
+        self._paused = False
+        self._wake_event = threading.Event()
+        self._force_courses_refresh = False
+        self._fetch_pool = None
+        # Workers are started lazily from a course-fetch thread of a multi-threaded Qt process, where
+        # forking can deadlock. A spawned worker re-imports __main__ (main.py, and with it PyQt6 and
+        # the scenes, without creating a QApplication), which costs a fraction of a second per worker
+        # once; the workers then stay up for the lifetime of the pool.
+        self._process_pool = ProcessPoolExecutor(max_workers=min(max_workers, os.cpu_count() or 1),
+                                                 mp_context=multiprocessing.get_context("spawn")) \
+            if use_process_pool else None
+        self.diff_engine = DiffEngine()
         self.first_load = False
+        # Read up front so the dashboard can be built from it before moj.tvz.hr answers.
+        self._warm_snapshot = load_snapshot()
+        self.student_name = self._warm_snapshot[2] if self._warm_snapshot else None
+        self._name_changed = False
 
 
     def run(self):
-        while self._is_running:
-            files, notifications, reservation_links = self.get_course_info()
-
-            if files:
-                for course_name, course_files in files.items():
-                    sorted_files = sorted(course_files, key=lambda x: datetime.strptime(x['date'], "%d.%m.%y"))
-                    for file in sorted_files:
-                        if course_name not in self.current_files:
-                            self.current_files[course_name] = []
-
-                        if file not in self.current_files[course_name]:
-                            self.current_files[course_name].append(file)
-                            self.files_updated.emit({course_name: file})
-
-            if notifications:
-                combined_notifications = []
-
-                for course_name, course_notifications in notifications.items():
-                    for notification in course_notifications:
-                        try:
-                            notification_time = datetime.strptime(notification['time'], "%d.%m.%Y u %Hh")
-                            combined_notifications.append((course_name, notification, notification_time))
-                        except ValueError as e:
-                            print(f"Error parsing date for notification in {course_name}: {e}")
-                            continue
+        self._load_warm_start()
+        # Not set up yet when the dashboard was built from the snapshot without get_student_name.
+        self.ensure_session()
+        # Resumed downloads rebuild their url from the current state.
+        if self.state:
+            self.download_manager.resume_pending()
 
-                combined_notifications.sort(key=lambda x: x[2])
-
-                for course_name, notification, _ in combined_notifications:
-                    unique_id = (notification['title'], notification['time'])
+        while self._is_running:
+            if self._paused:
+                self._wait(None)
+                continue
 
-                    if course_name not in self.current_notifications:
-                        self.current_notifications[course_name] = set()
+            breaker = self.executor.breaker
+            if breaker.state == breaker.OPEN:
+                # moj.tvz.hr keeps failing, pause polling until the breaker lets a probe through.
+                self._wait(max(breaker.remaining_open_time(), 1.0))
+                continue
 
-                    if unique_id not in self.current_notifications[course_name]:
-                        self.current_notifications[course_name].add(unique_id)
-                        self.notification_updated.emit({course_name: notification})
+            self.executor.start_cycle(self.cycle_budget)
+            try:
+                courses = self._refresh_courses()
+                due_courses = {name: courses[name] for name in self.scheduler.due_courses() if name in courses}
+                files, notifications, reservation_links = self._get_course_details(due_courses)
+                self._apply_scrape(files, notifications, reservation_links)
+            except Exception as e:
+                print(f"Error during polling cycle: {e}")
+            finally:
+                self.executor.end_cycle()
 
             if self.first_load == False:
                 self.first_load = True
-                self.reservation_links_signal.emit(reservation_links, self.session)
                 self.first_load_signal.emit(True)
 
-            time.sleep(self.interval)
+            if self._courses is None:
+                self._wait(self.scheduler.min_interval)
+            else:
+                self._wait(self.scheduler.next_delay())
+
+    def _wait(self, timeout):
+        """Sleeps until timeout or until refresh_now/pause/resume/stop wakes the loop."""
+        self._wake_event.wait(timeout)
+        self._wake_event.clear()
+
+    def _load_warm_start(self):
+        """
+        Renders the dashboard from the last snapshot before the first network
+        cycle; the live scrape is then diffed against it like any other cycle.
+        """
+        loaded, self._warm_snapshot = self._warm_snapshot, None
+        if not loaded:
+            return
+
+        courses, reservation_links, _ = loaded
+        files = {name: course["files"] for name, course in courses.items()}
+        notifications = {name: course["notifications"] for name, course in courses.items()}
+        self._apply_scrape(files, notifications, reservation_links, save=False)
+
+        self.first_load = True
+        self.first_load_signal.emit(True)
+
+    def _apply_scrape(self, files, notifications, reservation_links, save=True):
+        events, self._dropped_events = self._dropped_events, []
+        for course_name, course_files in files.items():
+            events.extend(self.diff_engine.diff_files(course_name, course_files))
+        for course_name, course_notifications in notifications.items():
+            events.extend(self.diff_engine.diff_notifications(course_name, course_notifications))
+        self.diff_engine.record(events)
+
+        links_changed = self._links_dropped or \
+            any(self.reservation_links.get(name) != link for name, link in reservation_links.items())
+        self._links_dropped = False
+        self.reservation_links.update(reservation_links)
+        if links_changed:
+            self.reservation_links_signal.emit(dict(self.reservation_links),
+                                               self.session_provider.handle("reservation"))
+
+        file_events = [event for event in events if event.entity == FILE]
+        file_events.sort(key=lambda event: event.item.sort_key)
+
+        notification_events = [event for event in events if event.entity == NOTIFICATION]
+        notification_events.sort(key=lambda event: event.item.sort_key)
+
+        # One cross-thread signal per cycle; the modules apply the whole batch at once.
+        if file_events or notification_events:
+            self.changes_updated.emit(file_events + notification_events)
+
+        # Without an earlier state to diff against every file looks new, so nothing is prefetched then.
+        if save and self.first_load:
+            self.prefetch.on_changes(file_events)
+
+        if save and self._is_running and (events or links_changed or self._name_changed):
+            self._name_changed = False
+            save_snapshot(self.diff_engine.snapshot(), self.reservation_links, self.student_name)
+
+    def _refresh_courses(self):
+        now = time.monotonic()
+        if self._courses is None or self._force_courses_refresh or now - self._courses_refreshed_at >= self.interval:
+            self._force_courses_refresh = False
+            courses = self.get_courses()
+            if courses is not None:
+                self._courses = courses
+                self._courses_refreshed_at = now
+                self.scheduler.sync_courses(courses)
+                self._retain_courses(courses)
+
+        return self._courses or {}
+
+    def _retain_courses(self, courses):
+        """
+        Drops the courses that left the "Moji predmeti" list, e.g. at the start
+        of a new semester, so their files and notifications leave the UI and
+        the snapshot. An empty list is more likely a broken page than no
+        courses at all, so it is ignored.
+        """
+        if not courses:
+            return
+        self._dropped_events.extend(self.diff_engine.retain_courses(courses))
+        for course_name in [name for name in self._course_pages if name not in courses]:
+            del self._course_pages[course_name]
+        for course_name in [name for name in self.reservation_links if name not in courses]:
+            del self.reservation_links[course_name]
+            self._links_dropped = True
+
+    def set_focused_course(self, course_name):
+        self.scheduler.set_focused_course(course_name)
+        self._wake_event.set()
+
+    def refresh_now(self, course=None):
+        """Polls one course, or the course list and every course, without waiting for the schedule."""
+        if course is None:
+            self._force_courses_refresh = True
+        self.scheduler.mark_due(course)
+        self._wake_event.set()
+
+    def pause(self):
+        self._paused = True
+        self._wake_event.set()
+
+    def resume(self):
+        self._paused = False
+        self._wake_event.set()
 
     def stop(self):
         self._is_running = False
-
-    def load_cookies_to_requests(self, cookie_file="cookies.json"):
-        session = requests.Session()
-        if os.path.exists(cookie_file):
-
-            with open(cookie_file, "r") as file:
-                cookies = json.load(file)
-                for cookie in cookies:
-
-                    session_cookie = create_cookie(
-                        name=cookie['name'],
-                        value=cookie['value'],
-                        domain=cookie['domain'],
-                        path=cookie['path'],
-                        secure=cookie['secure'],
-                        rest={'HttpOnly': cookie['httpOnly']}
-                    )
-                    session.cookies.set_cookie(session_cookie)
-
-                    if cookie['name'].startswith("MOJ"):
-                        print("name is: " + cookie['name'])
-                        self.state = cookie['name']
-                        print("state is: " + self.state)
-
-        return session
+        self.executor.cancel()
+        self.download_manager.shutdown()
+        if self._fetch_pool is not None:
+            self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+        self._wake_event.set()
+
+    def load_cookies_to_requests(self):
+        self.state = self.session_provider.load_cookies()
+        return self.session_provider.handle("scraping")
+
+    def ensure_session(self):
+        if self.session is None:
+            self.session = self.load_cookies_to_requests()
+        else:
+            self.state = self.session_provider.load_cookies()
 
     def get_student_name(self):
-        self.session = self.load_cookies_to_requests()
+        self.ensure_session()
         try:
             if not self.state:
                 print("Error: state is not set.")
                 return None
 
-            url = "https://moj.tvz.hr/index.php?state=" + self.state
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            p_tag = soup.find('p', class_='card-text')
-
-            if p_tag:
-                text = p_tag.get_text(strip=True)
-                parts = text.split()
-                if "Student" in parts:
-                    student_index = parts.index("Student")
-                    if student_index + 1 < len(parts):
-                        student_name = parts[student_index + 1]
-                        return student_name
-
-            return None
+            student_name, _ = self._get_index_page("startup")
+            self._update_student_name(student_name)
+            return student_name
         except Exception as e:
             print(f"Error in get_student_name: {e}")
             return None
 
     def get_course_info(self):
+        courses_info = self.get_courses()
+        if courses_info is None:
+            return None
+        return self._get_course_details(courses_info)
+
+    def get_courses(self):
         try:
             if not self.state:
                 print("Error: state is not set.")
+                self._expire_session()
                 return None
 
-            url = "https://moj.tvz.hr/index.php?state=" + self.state
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            link_tag = soup.find('a', string="Moji predmeti")
-            if link_tag:
-                link = link_tag['href']
+            student_name, link = self._get_index_page()
+            if not student_name and not link:
+                # moj.tvz.hr answered with its login page instead of the student's index page.
+                self._expire_session()
+                return None
+            self._update_student_name(student_name)
+            if link:
                 return self._extract_courses(link)
             else:
                 return None
 
         except Exception as e:
-            print(f"get_course_info: {e}")
+            print(f"get_courses: {e}")
             return None
 
+    def _expire_session(self):
+        """Stops polling and reports once that the cookies no longer log in to moj.tvz.hr."""
+        if self._is_running:
+            self._is_running = False
+            self.session_expired.emit()
+
+    def _update_student_name(self, student_name):
+        """Reconciles the name shown from the snapshot with the one on the live index page."""
+        if student_name and student_name != self.student_name:
+            self.student_name = student_name
+            self._name_changed = True
+            self.student_name_changed.emit(student_name)
+
+    def _get_index_page(self, endpoint="page"):
+        """Returns (student_name, courses_link), both read from the same index page."""
+        url = "https://moj.tvz.hr/index.php?state=" + self.state
+        return self._conditional_get(url, self._parse_index_page, endpoint)
+
+    def _conditional_get(self, url, parse, endpoint="page"):
+        """
+        GET url and return parse(response). When the server answers 304 or the
+        body digest is unchanged, the previously parsed result is reused and
+        parse is not called at all. Concurrent calls for the same url and parse
+        share one request, and its result is reused for a short coalescing TTL.
+        """
+        return self.single_flight.do((url, parse), lambda: self._fetch_and_parse(url, parse, endpoint))
+
+    def _fetch_and_parse(self, url, parse, endpoint):
+        response = self.executor.get(url, endpoint, headers=self.validator_cache.request_headers(url))
+
+        cached = self.validator_cache.not_modified(url, response)
+        if cached is not None:
+            return cached
+
+        response.raise_for_status()
+
+        digest = self.validator_cache.digest(response.content)
+        cached = self.validator_cache.matching_result(url, digest)
+        if cached is not None:
+            return cached
+
+        result = parse(response)
+        self.validator_cache.store(url, response, digest, result)
+        return result
+
+    def _parse_index_page(self, response):
+        soup = html_parser.make_soup(response.text, parse_only=html_parser.INDEX_PAGE)
+        return self._parse_student_name(soup), self._parse_courses_link(soup)
+
+    def _parse_student_name(self, soup):
+        p_tag = soup.find('p', class_='card-text')
+
+        if p_tag:
+            text = p_tag.get_text(strip=True)
+            parts = text.split()
+            if "Student" in parts:
+                student_index = parts.index("Student")
+                if student_index + 1 < len(parts):
+                    student_name = parts[student_index + 1]
+                    return student_name
+
+        return None
+
+    def _parse_courses_link(self, soup):
+        link_tag = soup.find('a', string="Moji predmeti")
+        if link_tag:
+            return link_tag['href']
+        return None
+
     def _extract_courses(self,link):
         try:
-            response = self.session.get(link, timeout=10)
-            response.raise_for_status()
+            return self._conditional_get(link, self._parse_courses)
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            courses_info = {}
+        except Exception as e:
+            print(f"extract_courses: {e}")
+            return None
 
-            forms = soup.select('div.card-body form')
+    def _parse_courses(self, response):
+        soup = html_parser.make_soup(response.text, parse_only=html_parser.COURSES_PAGE)
+        courses_info = {}
 
-            for form in forms:
-                action_url = form['action']
+        forms = soup.select('div.card-body form')
 
-                match = re.search(r'studij=([^&]+)', action_url)
-                if not match:
-                    continue
-                studij_value = match.group(1)
+        for form in forms:
+            action_url = form['action']
 
-                link_tag = form.find('a', href=re.compile(rf'studij={studij_value}'))
-                if link_tag:
-                    link = link_tag['href']
-                    course_name = link_tag.text.strip()
+            match = re.search(r'studij=([^&]+)', action_url)
+            if not match:
+                continue
+            studij_value = match.group(1)
 
-                    course_name_clean = re.sub(r'\(.*?\)', '', course_name).strip()
+            link_tag = form.find('a', href=re.compile(rf'studij={studij_value}'))
+            if link_tag:
+                link = link_tag['href']
+                course_name = link_tag.text.strip()
 
-                    if course_name_clean not in courses_info:
-                        courses_info[course_name_clean] = link
+                course_name_clean = re.sub(r'\(.*?\)', '', course_name).strip()
 
-            return self._get_course_details(courses_info)
+                if course_name_clean not in courses_info:
+                    courses_info[course_name_clean] = link
 
-        except Exception as e:
-            print(f"extract_courses: {e}")
-            return None
+        return courses_info
 
-    def _extract_notifications(self, soup):
-        notifications = []
-        notification_elements = soup.select('div.card-header')
+    def _fetch_course_page(self, course_name, course_url):
+        if self.streaming:
+            return self.single_flight.do((course_url, self._stream_course_page),
+                                         lambda: self._stream_course_page(course_url))
+        return self._conditional_get(course_url, self._parse_course_page, endpoint="course")
 
-        for element in notification_elements:
-            try:
-                title = element.find('h5', class_='card-title').text.strip()
-                message = element.find_next_sibling('div', class_='card-body').text.strip()
-                time_raw = element.find('h6', class_='card-subtitle').text.strip()
-
-                time_match = re.search(r'\d{1,2}\.\d{1,2}\.\d{4} u \d{1,2}h', time_raw)
-                time = time_match.group(0) if time_match else time_raw
-
-                notifications.append({
-                    'title': title,
-                    'message': message,
-                    'time': time
-                })
-            except Exception as e:
-                print(f"Error extracting notification: {e}")
-                continue
+    def _stream_course_page(self, url):
+        """
+        Streaming variant of _conditional_get for course pages: the body is fed
+        to the incremental parser chunk by chunk while it downloads and is never
+        held in memory as a whole. The process pool is not used in this mode.
+        """
+        response = self.executor.get(url, "course", headers=self.validator_cache.request_headers(url), stream=True)
+        try:
+            cached = self.validator_cache.not_modified(url, response)
+            if cached is not None:
+                return cached
 
-        return notifications
+            response.raise_for_status()
 
-    def _extract_files(self, soup):
-        files = []
+            hasher = self.validator_cache.new_digest()
 
-        file_containers = soup.select('div.col-sm-3 div.shadow.p-3.mb-5.rounded')
+            def chunks():
+                for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                    hasher.update(chunk)
+                    yield chunk
 
-        for container in file_containers:
-            try:
-                section_variable = container.select_one('h5').get_text(strip=True)
-
-                list_items = container.select('li.list-group-item')
-                for item in list_items:
-                    try:
-                        a_tags = item.find_all('a')
-                        if len(a_tags) < 2:
-                            raise ValueError("Didn't find two <a> tags in the snippet!")
-
-                        first_a = a_tags[0]
-                        second_a = a_tags[1]
-
-                        img_tag = first_a.find('img')
-                        type_variable = ""
-                        if img_tag and img_tag.has_attr("src"):
-                            src = img_tag["src"]
-                            filename = src.split('/')[-1]
-                            type_variable = filename.split('.')[0]
-
-                        second_href = second_a.get('href', '')
-
-                        extension = ""
-                        if "skini/repoz" in second_href:
-                            match = re.search(r"(skini/repoz)(.*)", second_href)
-                            if match:
-                                extension = match.group(2)
-                            else:
-                                extension = second_href
-                        else:
-                            extension = second_href
-
-                        second_text = second_a.get_text(strip=True)
-                        date_variable = ""
-                        name_variable = second_text
-                        match_date = re.search(r"\[([^]]+)\]", second_text)
-                        if match_date:
-                            date_variable = match_date.group(1)
-                            name_variable = re.sub(r"\[[^]]+\]", "", name_variable).strip()
-
-                        files.append({
-                            'name': name_variable,
-                            'extension': extension,
-                            'type': type_variable,
-                            'date': date_variable,
-                            'section': section_variable
-                        })
-
-                    except Exception as e:
-                        print(f"Error extracting file details: {e}")
-                        continue
+            result = stream_parser.parse_course_page(chunks(), response.encoding)
+        finally:
+            response.close()
 
-            except Exception as e:
-                print(f"Error extracting section details: {e}")
-                continue
+        # An unchanged body keeps the previous result object, so the scheduler sees it as unchanged for free.
+        digest = hasher.hexdigest()
+        cached = self.validator_cache.matching_result(url, digest)
+        if cached is not None:
+            return cached
+
+        self.validator_cache.store(url, response, digest, result)
+        return result
+
+    def _parse_course_page(self, response):
+        if self._process_pool is not None:
+            # Raw bytes go to a worker process and only plain records come back,
+            # so tree walking never competes with the Qt main thread for the GIL.
+            future = self._process_pool.submit(extraction.extract_course_page, response.content, response.encoding)
+            return future.result()
 
-        return files
+        return extraction.extract_course_page(response.content, response.encoding)
 
     def _get_course_details(self, course_info):
         files = {}
         notifications = {}
         reservation_links = {}
 
-        try:
-            for course_name, course_url in course_info.items():
-                response = self.session.get(course_url, timeout=10)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-                extracted_files = self._extract_files(soup)
-                extracted_notifications = self._extract_notifications(soup)
-
-                link_tags = soup.find_all('a', class_='nav-link mojtvzlink', onclick=True)
-                for link_tag in link_tags:
-                    if 'Rezervacija labosa' in link_tag.get_text():
-                        onclick_content = link_tag['onclick']
-                        start_idx = onclick_content.find("'") + 1
-                        end_idx = onclick_content.find("',", start_idx)
-                        reservation_link = onclick_content[start_idx:end_idx]
-                        reservation_links[course_name] = reservation_link
-                        break
-
-                files[course_name] = extracted_files
-                notifications[course_name] = extracted_notifications
+        if not course_info:
+            return files, notifications, reservation_links
 
-        except Exception as e:
-            print(f"Error fetching course details: {e}")
+        if self._fetch_pool is None:
+            self._fetch_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="course-fetch")
+
+        futures = {
+            course_name: self._fetch_pool.submit(self._fetch_course_page, course_name, course_url)
+            for course_name, course_url in course_info.items()
+        }
+
+        # Poll instead of blocking on result() so stop() is not held up by a slow page.
+        pending = set(futures.values())
+        while pending and self._is_running:
+            _, pending = wait(pending, timeout=0.1)
+        if not self._is_running:
+            return files, notifications, reservation_links
+
+        # Results are collected in the order of course_info, not in completion
+        # order, so the emitted signals stay deterministic between cycles.
+        for course_name, future in futures.items():
+            try:
+                course_page = future.result()
+            except Exception as e:
+                print(f"Error fetching course details for {course_name}: {e}")
+                self.scheduler.record_result(course_name, changed=False)
+                continue
+
+            previous_page = self._course_pages.get(course_name)
+            changed = previous_page is not None and course_page is not previous_page and course_page != previous_page
+            self._course_pages[course_name] = course_page
+            self.scheduler.record_result(course_name, changed)
+
+            extracted_files, extracted_notifications, reservation_link = course_page
+
+            files[course_name] = extracted_files
+            notifications[course_name] = extracted_notifications
+            if reservation_link:
+                reservation_links[course_name] = reservation_link
 
         return files, notifications, reservation_links
 
@@ -311,13 +485,26 @@ class DataApiThread(QThread):
 
     def extract_filename_from_content_disposition(self, content_disposition: str) -> str:
         if content_disposition:
-            match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', content_disposition)
+            # RFC 5987 filename*=charset''percent-encoded takes precedence over the plain filename.
+            match = re.search(r"filename\*\s*=\s*([\w-]+)'[^']*'([^;]+)", content_disposition, re.IGNORECASE)
+            if match:
+                try:
+                    return unquote(match.group(2).strip().strip('"'), encoding=match.group(1))
+                except LookupError:
+                    return unquote(match.group(2).strip().strip('"'))
+            match = re.search(r'filename\s*=\s*"?([^";]+)"?', content_disposition, re.IGNORECASE)
             if match:
-                return match.group(1)
+                return match.group(1).strip()
         return ''
 
     def determine_filename(self, response, filename: str) -> str:
-        content_type = response.headers.get('Content-Type', '')
+        suggested_name = self.extract_filename_from_content_disposition(response.headers.get('Content-Disposition'))
+        # Only the name is used, a header can not choose the directory.
+        suggested_name = os.path.basename(suggested_name.replace('\\', '/'))
+        if suggested_name:
+            filename = suggested_name
+
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
         suggested_extension = mimetypes.guess_extension(content_type)
 
         original_extension = os.path.splitext(filename)[1]
@@ -329,51 +516,25 @@ class DataApiThread(QThread):
 
         return filename
 
-    def download_file(self, extension: str, filename: str) -> bool:
-        try:
-            # Construct the download URL
-            url = f"https://moj.tvz.hr/index.php?TVZ={self.state}&link=skini/repoz{extension}"
+    def course_files(self, course_name=None) -> dict:
+        """The last scraped files as {course: [FileRecord]}, for one course or all of them."""
+        return {name: course.get("files", []) for name, course in self.diff_engine.snapshot().items()
+                if course_name is None or name == course_name}
 
-            response = self.session.head(url, timeout=10)
-            response.raise_for_status()
+    def download_url(self, extension: str) -> str:
+        return f"https://moj.tvz.hr/index.php?TVZ={self.state}&link=skini/repoz{extension}"
 
-            final_filename = self.determine_filename(response, filename)
-            print(f"Final determined filename: {final_filename}")
-
-            file_dialog = QFileDialog()
-            file_dialog.setFileMode(QFileDialog.FileMode.AnyFile)
-            file_dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
-            file_dialog.setWindowTitle('Save File As')
-            file_dialog.selectFile(final_filename)
-
-            if file_dialog.exec() == QFileDialog.DialogCode.Accepted:
-                save_path = file_dialog.selectedFiles()[0]
-                print(f"Saving file to: {save_path}")
-
-                with self.session.get(url, stream=True, timeout=30) as response:
-                    response.raise_for_status()
-                    total_downloaded = 0
-                    expected_size = int(response.headers.get('Content-Length', 0))
-
-                    with open(save_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                total_downloaded += len(chunk)
-                                #print(f"Downloaded {total_downloaded} / {expected_size} bytes")
-
-               # print(f"Download completed. Total bytes downloaded: {total_downloaded}")
-                if total_downloaded != expected_size:
-                    print(f"Warning: Downloaded size ({total_downloaded} bytes) does not match expected size ({expected_size} bytes).")
-                    return False
-
-                return True
-
-        except requests.RequestException as e:
-            print(f"Network error occurred: {e}")
-            return False
-        except Exception as e:
-            print(f"Error downloading file: {e}")
-            return False
+    def download_file(self, extension: str, filename: str, version=None) -> int:
+        """Queues the file on the download manager and returns the job id."""
+        return self.download_manager.enqueue(self.download_url(extension), filename, extension, version)
 
+    def cached_file(self, extension: str, version=None):
+        """Path of the local copy of the file if it is cached for this version, otherwise None."""
+        return self.blob_cache.path(extension, version)
 
+    def cache_file(self, extension: str, filename: str, version=None) -> int:
+        """Downloads the file into the local cache; the job's job_finished signal carries the cached path."""
+        job_id = self.prefetch.take_over(extension)
+        if job_id is not None:
+            return job_id
+        return self.download_manager.enqueue_to_cache(self.download_url(extension), filename, extension, version)
@@ -0,0 +1,92 @@
+import threading
+from collections import deque, namedtuple
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+FILE = "file"
+NOTIFICATION = "notification"
+
+ChangeEvent = namedtuple("ChangeEvent", ["kind", "entity", "course", "key", "item", "previous"])
+
+
+def file_key(course_name, file):
+    return course_name, file.section, file.extension
+
+
+def notification_key(course_name, notification):
+    return course_name, notification.title, notification.time
+
+
+class DiffEngine:
+    """
+    Keeps the last scraped state of every course indexed by fingerprint, so a
+    new scrape of a course is diffed against it in O(n) and turned into
+    added / changed / removed ChangeEvents. The polling thread diffs while
+    the UI thread reads snapshot() and items(), so the state is guarded by a
+    lock.
+    """
+
+    def __init__(self, history_size: int = 20):
+        self._state = {FILE: {}, NOTIFICATION: {}}
+        self.history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def diff_files(self, course_name, files) -> list:
+        return self._diff(FILE, course_name, files, file_key)
+
+    def diff_notifications(self, course_name, notifications) -> list:
+        return self._diff(NOTIFICATION, course_name, notifications, notification_key)
+
+    def record(self, events) -> None:
+        """Appends one cycle's events to the bounded delta history."""
+        if events:
+            with self._lock:
+                self.history.append(tuple(events))
+
+    def retain_courses(self, course_names) -> list:
+        """Forgets every course not in course_names and returns REMOVED events for its items."""
+        course_names = set(course_names)
+        events = []
+        with self._lock:
+            for entity in (FILE, NOTIFICATION):
+                for course_name in [name for name in self._state[entity] if name not in course_names]:
+                    for key, item in self._state[entity].pop(course_name).items():
+                        events.append(ChangeEvent(REMOVED, entity, course_name, key, item, item))
+        return events
+
+    def items(self, entity, course_name) -> list:
+        with self._lock:
+            return list(self._state[entity].get(course_name, {}).values())
+
+    def snapshot(self) -> dict:
+        """Current state as {course: {'files': [...], 'notifications': [...]}}."""
+        courses = {}
+        with self._lock:
+            for entity, field in ((FILE, 'files'), (NOTIFICATION, 'notifications')):
+                for course_name, items in self._state[entity].items():
+                    courses.setdefault(course_name, {})[field] = list(items.values())
+        return courses
+
+    def _diff(self, entity, course_name, items, key_func) -> list:
+        with self._lock:
+            previous = self._state[entity].get(course_name, {})
+        current = {key_func(course_name, item): item for item in items}
+        events = []
+
+        for key, item in current.items():
+            old_item = previous.get(key)
+            if old_item is None:
+                events.append(ChangeEvent(ADDED, entity, course_name, key, item, None))
+            elif old_item != item:
+                events.append(ChangeEvent(CHANGED, entity, course_name, key, item, old_item))
+
+        for key, old_item in previous.items():
+            if key not in current:
+                events.append(ChangeEvent(REMOVED, entity, course_name, key, old_item, old_item))
+
+        # The course's dict is replaced rather than mutated, so readers never see it half-updated.
+        with self._lock:
+            self._state[entity][course_name] = current
+        return events
@@ -0,0 +1,565 @@
+import hashlib
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.tvz_enhancer.data import partial_downloads
+from src.tvz_enhancer.data.download_writer import PreallocatedWriter, hash_prefix, MAX_CHUNK_SIZE
+from src.tvz_enhancer.data.partial_downloads import PendingRegistry
+
+QUEUED = "queued"
+WAITING_FOR_PATH = "waiting_for_path"
+RUNNING = "running"
+PAUSED = "paused"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+DONE_STATES = (FINISHED, FAILED, CANCELLED)
+
+# The writer reads the raw connection, so the body must not be compressed on the wire.
+IDENTITY = {'Accept-Encoding': 'identity'}
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class DownloadJob:
+    def __init__(self, job_id: int, url: str, filename: str, cache_key=None, cache_version=None):
+        self.id = job_id
+        self.url = url
+        self.filename = filename
+        self.cache_key = cache_key
+        self.cache_version = cache_version
+        self.save_path = None
+        # The path whose .part file receives the bytes: a temporary buffer until save_path is known.
+        self.target = None
+        self.buffering = False
+        self.body_complete = False
+        self.into_cache = False
+        self.from_cache = False
+        self.endpoint = "download"
+        # Bytes per second (0 means unthrottled) and largest accepted file size (0 means any).
+        self.max_rate = 0
+        self.max_size = 0
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.state = QUEUED
+        self.downloaded = 0
+        self.total = 0
+        self.throughput = 0.0
+        self.error = None
+        self.future = None
+        self.cancelled = threading.Event()
+        self.resumed = threading.Event()
+        self.resumed.set()
+        self._sample_time = None
+        self._sample_bytes = 0
+        self._last_emit = 0.0
+        self._rate_start = None
+        self._rate_bytes = 0
+
+    def eta(self) -> float:
+        """Seconds until the job is done at the current throughput, -1 when unknown."""
+        if self.throughput <= 0 or not self.total:
+            return -1.0
+        return max(self.total - self.downloaded, 0) / self.throughput
+
+
+class DownloadManager(QObject):
+    """
+    Runs file downloads on a small pool of worker threads instead of the
+    calling (UI) thread. A job sends a single GET and takes the filename from
+    its headers, then asks for a save location through save_path_requested.
+    The body keeps buffering to a temporary .part file meanwhile and moves to
+    the chosen location once set_save_path() answered.
+
+    Bytes go to a .part file with a sidecar manifest. An interrupted transfer
+    is continued with a Range request, and transfers that never finished are
+    picked up again by resume_pending() on the next start.
+
+    Jobs with a cache_key are revalidated against the BlobCache and copied
+    from it when unchanged (or when moj.tvz.hr cannot be reached); finished
+    downloads are added to it.
+    """
+
+    save_path_requested = pyqtSignal(int, str)
+    job_state_changed = pyqtSignal(int, str)
+    # job id, bytes downloaded, total bytes (0 if unknown), bytes per second, ETA in seconds (-1 if unknown)
+    job_progress = pyqtSignal(int, object, object, float, float)
+    job_finished = pyqtSignal(int, str)
+    job_failed = pyqtSignal(int, str)
+
+    def __init__(self, executor, filename_resolver, max_workers: int = 3, chunk_size: int = 65536,
+                 max_chunk_size: int = MAX_CHUNK_SIZE, progress_interval: float = 0.2, resume_attempts: int = 3,
+                 pending: PendingRegistry = None, cache=None, url_for=None, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.filename_resolver = filename_resolver
+        # Builds the download url of a repository id with the current session, used by resume_pending().
+        self.url_for = url_for
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.progress_interval = progress_interval
+        self.resume_attempts = resume_attempts
+        self.pending = pending or PendingRegistry()
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._shutting_down = False
+
+    def enqueue(self, url: str, filename: str, cache_key=None, cache_version=None) -> int:
+        job = DownloadJob(next(self._ids), url, filename, cache_key, cache_version)
+        return self._submit(job, self._start)
+
+    def enqueue_to_cache(self, url: str, filename: str, cache_key, cache_version=None, endpoint: str = "download",
+                         max_rate: float = 0, max_size: int = 0) -> int:
+        """Downloads straight into the cache without asking for a location; job_finished reports the blob path."""
+        job = DownloadJob(next(self._ids), url, filename, cache_key, cache_version)
+        job.into_cache = True
+        job.endpoint = endpoint
+        job.max_rate = max_rate
+        job.max_size = max_size
+        job.save_path = job.target = self.cache.staging_path(cache_key)
+        return self._submit(job, self._transfer)
+
+    def _submit(self, job, step) -> int:
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._pool.submit(step, job)
+        self.job_state_changed.emit(job.id, QUEUED)
+        return job.id
+
+    def resume_pending(self) -> list:
+        """Queues every unfinished transfer from an earlier run and returns the new job ids."""
+        job_ids = []
+        running = {job.save_path for job in self.active_jobs()}
+
+        for save_path in self.pending.entries():
+            manifest = partial_downloads.load_manifest(save_path)
+            if not manifest or not manifest.get('url'):
+                self.pending.remove(save_path)
+                continue
+            if save_path in running:
+                continue
+
+            key = manifest.get('key')
+            url = self.url_for(key) if key and self.url_for is not None else manifest['url']
+            job = DownloadJob(next(self._ids), url, os.path.basename(save_path), key, manifest.get('version'))
+            job.save_path = job.target = save_path
+            job_ids.append(self._submit(job, self._transfer))
+
+        return job_ids
+
+    def job(self, job_id: int):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_jobs(self) -> list:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.state not in DONE_STATES]
+
+    def throughput(self) -> float:
+        """Combined bytes per second of all running jobs."""
+        return sum(job.throughput for job in self.active_jobs() if job.state == RUNNING)
+
+    def set_save_path(self, job_id: int, save_path) -> None:
+        """Answers save_path_requested; an empty path cancels the job."""
+        job = self.job(job_id)
+        if job is None or job.state != WAITING_FOR_PATH:
+            return
+        if not save_path:
+            self.cancel(job_id)
+            return
+
+        with self._lock:
+            if job.state != WAITING_FOR_PATH:
+                return
+            job.save_path = save_path
+            # A worker that is still buffering the body picks the path up itself.
+            buffering = job.buffering
+        if not buffering:
+            self._set_state(job, QUEUED)
+            job.future = self._pool.submit(self._transfer, job)
+
+    def cancel(self, job_id: int) -> None:
+        job = self.job(job_id)
+        if job is None or job.state in DONE_STATES:
+            return
+
+        with self._lock:
+            job.cancelled.set()
+            idle = job.state == WAITING_FOR_PATH and not job.buffering
+        job.resumed.set()
+        if idle or (job.future is not None and job.future.cancel()):
+            if job.target and job.target != job.save_path:
+                partial_downloads.discard(job.target)
+            self._set_state(job, CANCELLED)
+
+    def pause(self, job_id: int) -> None:
+        job = self.job(job_id)
+        if job is not None and job.state not in DONE_STATES:
+            job.resumed.clear()
+
+    def resume(self, job_id: int) -> None:
+        job = self.job(job_id)
+        if job is not None:
+            job.resumed.set()
+
+    def promote(self, job_id: int) -> None:
+        """Lifts the throttling of a background job because the user is now waiting for it."""
+        job = self.job(job_id)
+        if job is not None:
+            job.endpoint = "download"
+            job.max_rate = 0
+
+    def shutdown(self) -> None:
+        """Stops every job but keeps partial data, so the transfers resume on the next start."""
+        self._shutting_down = True
+        for job in self.active_jobs():
+            self.cancel(job.id)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _set_state(self, job, state):
+        job.state = state
+        self.job_state_changed.emit(job.id, state)
+
+    def _start(self, job):
+        try:
+            self._check_cancelled(job)
+            cached = self._cached_entry(job)
+            headers = dict(IDENTITY, **self.cache.request_headers(job.cache_key, job.cache_version)) \
+                if cached else dict(IDENTITY)
+            try:
+                response = self.executor.get(job.url, job.endpoint, stream=True, headers=headers)
+            except requests.RequestException:
+                if not cached:
+                    raise
+                # Offline, the cached copy is the best we have.
+                response = None
+
+            if cached and (response is None or response.status_code == 304):
+                if response is not None:
+                    response.close()
+                job.from_cache = True
+                job.filename = cached['filename']
+                self._request_save_path(job)
+                return
+
+            with response:
+                response.raise_for_status()
+                job.filename = self.filename_resolver(response, job.filename)
+                job.target = partial_downloads.buffer_path()
+                self._begin_body(job, response, 0)
+                with self._lock:
+                    job.buffering = True
+                self._request_save_path(job)
+                job.body_complete = self._write_body(job, response, 0)
+        except DownloadCancelled:
+            self._set_cancelled(job)
+            return
+        except Exception as e:
+            self._fail(job, e)
+            if job.target and job.target != job.save_path:
+                partial_downloads.discard(job.target)
+            return
+        finally:
+            with self._lock:
+                job.buffering = False
+                cancelled = job.cancelled.is_set() and job.state not in DONE_STATES
+                chosen = job.save_path is not None and job.state not in DONE_STATES
+
+        if cancelled:
+            self._set_cancelled(job)
+        elif chosen:
+            self._transfer(job)
+
+    def _request_save_path(self, job):
+        self._set_state(job, WAITING_FOR_PATH)
+        self.save_path_requested.emit(job.id, job.filename)
+
+    def _transfer(self, job):
+        try:
+            self._check_cancelled(job)
+            if job.state != RUNNING:
+                self._set_state(job, RUNNING)
+            if self._transfer_from_cache(job):
+                return
+
+            if job.target != job.save_path:
+                self._adopt(job)
+            elif not job.into_cache:
+                self.pending.add(job.save_path)
+
+            attempt = 0
+            while not (job.body_complete or self._transfer_once(job)):
+                attempt += 1
+                if attempt > self.resume_attempts:
+                    raise IOError(f"Download interrupted at {job.downloaded} of {job.total} bytes")
+                print(f"Resuming download of {job.filename} at {job.downloaded} bytes")
+                if job.cancelled.wait(min(2 ** attempt, 10)):
+                    raise DownloadCancelled()
+
+            partial_downloads.complete(job.save_path)
+            self.pending.remove(job.save_path)
+            self._store_in_cache(job)
+            self._set_state(job, FINISHED)
+            self.job_finished.emit(job.id, job.save_path)
+        except DownloadCancelled:
+            self._set_cancelled(job)
+        except Exception as e:
+            # The .part file and its manifest are kept, resume_pending() continues from there, unless
+            # the server refused the file for good. Cache downloads are not resumed, so they do not keep anything.
+            if job.into_cache or _is_permanent(e):
+                partial_downloads.discard(job.target)
+                if not job.into_cache:
+                    self.pending.remove(job.target)
+            self._fail(job, e)
+
+    def _transfer_once(self, job) -> bool:
+        """
+        Fetches whatever is still missing into the .part file. Returns False
+        when the connection broke off early and another attempt can resume.
+        """
+        offset = partial_downloads.resume_offset(job.save_path, job.url, job.cache_key)
+        headers = dict(IDENTITY)
+        if offset:
+            manifest = partial_downloads.load_manifest(job.save_path)
+            if manifest.get('total') and offset >= manifest['total']:
+                job.downloaded = job.total = offset
+                return offset == manifest['total'] or self._restart(job)
+
+            headers['Range'] = f"bytes={offset}-"
+            # If-Range makes the server send the whole file instead if it changed meanwhile;
+            # weak ETags are not allowed there.
+            etag = manifest.get('etag')
+            validator = etag if etag and not etag.startswith("W/") else manifest.get('last_modified')
+            if validator:
+                headers['If-Range'] = validator
+
+        try:
+            with self.executor.get(job.url, job.endpoint, stream=True, headers=headers) as response:
+                if response.status_code == 416:
+                    return self._restart(job)
+                response.raise_for_status()
+
+                offset = self._begin_body(job, response, offset)
+                if job.into_cache and not offset:
+                    job.filename = self.filename_resolver(response, job.filename)
+                return self._write_body(job, response, offset)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            print(f"Download interrupted: {e}")
+            return False
+
+    def _begin_body(self, job, response, offset) -> int:
+        """Takes size and validators from the response headers and returns the offset its body starts at."""
+        content_length = int(response.headers.get('Content-Length', 0))
+        if response.status_code == 206 and _content_range_start(response) == offset:
+            job.total = _content_range_total(response) or offset + content_length
+        else:
+            offset = 0
+            job.total = content_length
+        job.downloaded = offset
+
+        self._check_size(job, job.total)
+
+        job.etag = response.headers.get('ETag')
+        job.last_modified = response.headers.get('Last-Modified')
+        partial_downloads.save_manifest(job.target, job.url, job.total, job.etag, job.last_modified, offset,
+                                        job.cache_key, job.cache_version)
+        return offset
+
+    def _write_body(self, job, response, offset) -> bool:
+        """
+        Appends the response body to the target's .part file, moving it over
+        as soon as a save path is chosen. Returns False when the connection
+        broke off early and another attempt can resume.
+        """
+        job._sample_time = None
+        job._rate_start = None
+        hasher = None
+        if self.cache is not None and job.cache_key is not None:
+            # Hashed while streaming so the cache does not have to read the file again.
+            hasher = hashlib.sha256()
+            if offset:
+                hash_prefix(partial_downloads.part_path(job.target), hasher, offset)
+
+        writer = PreallocatedWriter(partial_downloads.part_path(job.target), offset, job.total, hasher,
+                                    lambda written: partial_downloads.checkpoint(job.target, written),
+                                    min_chunk=self.chunk_size, max_chunk=self.max_chunk_size)
+        try:
+            for size in writer.stream(response):
+                self._record_progress(job, size)
+                self._enforce_limits(job, size)
+                if job.target != job.save_path and job.save_path is not None:
+                    writer.close()
+                    self._adopt(job)
+                    self._set_state(job, RUNNING)
+                    writer.open(partial_downloads.part_path(job.target))
+
+                if job.target == job.save_path:
+                    self._wait_if_paused(job)
+                else:
+                    self._check_cancelled(job)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            print(f"Download interrupted: {e}")
+            return False
+        finally:
+            writer.close()
+            self._emit_progress(job)
+
+        if job.total and job.downloaded < job.total:
+            return False
+        if job.total and job.downloaded > job.total:
+            raise IOError(f"Downloaded size ({job.downloaded} bytes) does not match expected size "
+                          f"({job.total} bytes)")
+        job.digest = hasher.hexdigest() if hasher is not None else None
+        return True
+
+    def _check_size(self, job, size):
+        if job.max_size and size > job.max_size:
+            raise IOError(f"{job.filename} is larger than {job.max_size} bytes")
+
+    def _enforce_limits(self, job, size):
+        self._check_size(job, job.downloaded)
+        if not job.max_rate:
+            job._rate_start = None
+            return
+
+        now = time.monotonic()
+        if job._rate_start is None:
+            job._rate_start = now
+            job._rate_bytes = 0
+        job._rate_bytes += size
+        delay = job._rate_bytes / job.max_rate - (now - job._rate_start)
+        if delay > 0 and job.cancelled.wait(delay):
+            raise DownloadCancelled()
+
+    def _adopt(self, job):
+        """Moves what was buffered so far to the chosen save path."""
+        partial_downloads.move(job.target, job.save_path)
+        job.target = job.save_path
+        if not job.into_cache:
+            self.pending.add(job.save_path)
+
+    def _set_cancelled(self, job):
+        # On shutdown a transfer that already has its save path is kept for resume_pending().
+        if job.target and not (self._shutting_down and job.target == job.save_path):
+            partial_downloads.discard(job.target)
+            self.pending.remove(job.target)
+        self._set_state(job, CANCELLED)
+
+    def _cached_entry(self, job):
+        if self.cache is None or job.cache_key is None:
+            return None
+        return self.cache.lookup(job.cache_key, job.cache_version, touch=False)
+
+    def _transfer_from_cache(self, job) -> bool:
+        if not job.from_cache:
+            return False
+        if not self.cache.copy_to(job.cache_key, job.save_path, job.cache_version):
+            # The blob was evicted or deleted while the save dialog was open, fetch the file again.
+            print(f"Cached copy of {job.filename} is gone, downloading it again")
+            job.from_cache = False
+            job.target = job.save_path
+            return False
+        job.downloaded = job.total = os.path.getsize(job.save_path)
+        self._emit_progress(job)
+        self._set_state(job, FINISHED)
+        self.job_finished.emit(job.id, job.save_path)
+        return True
+
+    def _store_in_cache(self, job):
+        if self.cache is None or job.cache_key is None:
+            return
+        blob_path = self.cache.store(job.cache_key, job.save_path, job.filename, job.cache_version, job.etag,
+                                     job.last_modified, move=job.into_cache, digest=job.digest)
+        if job.into_cache:
+            if blob_path is None:
+                raise IOError(f"Could not add {job.filename} to the file cache")
+            job.save_path = blob_path
+
+    def _restart(self, job) -> bool:
+        """Throws the partial data away so the next attempt starts from the beginning."""
+        partial_downloads.discard(job.save_path)
+        job.downloaded = 0
+        return False
+
+    def _fail(self, job, error):
+        if isinstance(error, requests.RequestException):
+            print(f"Network error occurred: {error}")
+        else:
+            print(f"Error downloading file: {error}")
+        job.error = str(error)
+        self._set_state(job, FAILED)
+        self.job_failed.emit(job.id, job.error)
+
+    def _check_cancelled(self, job):
+        if job.cancelled.is_set():
+            raise DownloadCancelled()
+
+    def _wait_if_paused(self, job):
+        self._check_cancelled(job)
+        if job.resumed.is_set():
+            return
+
+        self._set_state(job, PAUSED)
+        job.throughput = 0.0
+        job.resumed.wait()
+        self._check_cancelled(job)
+        job._sample_time = None
+        self._set_state(job, RUNNING)
+
+    def _record_progress(self, job, size):
+        job.downloaded += size
+        now = time.monotonic()
+
+        if job._sample_time is None:
+            job._sample_time = now
+            job._sample_bytes = job.downloaded
+        elif now - job._sample_time >= self.progress_interval:
+            rate = (job.downloaded - job._sample_bytes) / (now - job._sample_time)
+            # Smoothed so a single slow chunk does not make the ETA jump around.
+            job.throughput = rate if job.throughput <= 0 else 0.7 * job.throughput + 0.3 * rate
+            job._sample_time = now
+            job._sample_bytes = job.downloaded
+
+        if now - job._last_emit >= self.progress_interval:
+            job._last_emit = now
+            self._emit_progress(job)
+
+    def _emit_progress(self, job):
+        self.job_progress.emit(job.id, job.downloaded, job.total, job.throughput, job.eta())
+
+
+def _is_permanent(error) -> bool:
+    """HTTP errors another attempt will not fix, e.g. 403 or 404."""
+    response = getattr(error, 'response', None)
+    return isinstance(error, requests.HTTPError) and response is not None \
+        and 400 <= response.status_code < 500 and response.status_code not in (408, 429)
+
+
+def _content_range_start(response):
+    """Start offset from a "Content-Range: bytes start-end/total" header, or None."""
+    value = response.headers.get('Content-Range', '')
+    try:
+        return int(value.split()[1].split('-')[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _content_range_total(response):
+    value = response.headers.get('Content-Range', '')
+    try:
+        return int(value.rsplit('/', 1)[1])
+    except (IndexError, ValueError):
+        return None
@@ -0,0 +1,118 @@
+import os
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+CHECKPOINT_BYTES = 4 * 1024 * 1024
+
+
+def hash_prefix(path: str, hasher, size: int, chunk_size: int = MAX_CHUNK_SIZE) -> None:
+    """Feeds the first size bytes of path to hasher, for a transfer that resumes at size."""
+    with open(path, "rb") as f:
+        while size > 0:
+            chunk = f.read(min(chunk_size, size))
+            if not chunk:
+                break
+            hasher.update(chunk)
+            size -= len(chunk)
+
+
+def _preallocate(f, size):
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+    except (AttributeError, OSError):
+        f.truncate(size)
+
+
+class PreallocatedWriter:
+    """
+    Writes a response body into a file that is grown to its final size up
+    front. The body is read from the raw connection into one reusable buffer
+    whose read size doubles from min_chunk up to max_chunk while reads keep
+    filling it. This skips the per-chunk objects of requests' iter_content;
+    urllib3 2.x still reads into a temporary bytes object and copies it into
+    the buffer, so it is not zero-copy.
+
+    Because the file is larger than what was received so far, its size no
+    longer tells how much is done: on_checkpoint(written) is called every
+    checkpoint_bytes and when the writer is closed, which also cuts the file
+    back to the bytes actually written.
+    """
+
+    def __init__(self, path: str, offset: int = 0, total: int = 0, hasher=None, on_checkpoint=None,
+                 min_chunk: int = MIN_CHUNK_SIZE, max_chunk: int = MAX_CHUNK_SIZE,
+                 checkpoint_bytes: int = CHECKPOINT_BYTES):
+        self.written = offset
+        self.total = total
+        self.hasher = hasher
+        self.on_checkpoint = on_checkpoint
+        self.chunk_size = min_chunk
+        self.max_chunk = max_chunk
+        self.checkpoint_bytes = checkpoint_bytes
+        self._buffer = memoryview(bytearray(max_chunk))
+        self._checkpointed = offset
+        self._file = None
+        self.open(path)
+
+    def open(self, path: str) -> None:
+        """(Re)opens the writer on path, continuing at the current offset."""
+        self._file = open(path, "r+b" if self.written and os.path.exists(path) else "wb")
+        if self.total > self.written:
+            _preallocate(self._file, self.total)
+        self._file.seek(self.written)
+
+    def stream(self, response):
+        """Writes the body of a streamed response, yielding the size of every chunk as it is written."""
+        if response.headers.get('Content-Encoding', 'identity').lower() != 'identity':
+            # The raw connection carries the encoded body, let requests decode it.
+            for chunk in response.iter_content(chunk_size=self.max_chunk):
+                if chunk:
+                    yield self._write(chunk)
+            return
+
+        try:
+            while True:
+                view = self._buffer[:self.chunk_size]
+                size = response.raw.readinto(view)
+                if not size:
+                    return
+                if size == self.chunk_size and self.chunk_size < self.max_chunk:
+                    self.chunk_size *= 2
+                yield self._write(view[:size])
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise requests.ConnectionError(e)
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.truncate(self.written)
+        finally:
+            self._file.close()
+            self._file = None
+        self._checkpoint()
+
+    def _write(self, data):
+        self._file.write(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        self.written += len(data)
+        if self.written - self._checkpointed >= self.checkpoint_bytes:
+            self._file.flush()
+            self._checkpoint()
+        return len(data)
+
+    def _checkpoint(self):
+        self._checkpointed = self.written
+        if self.on_checkpoint is not None:
+            self.on_checkpoint(self.written)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,119 @@
+import re
+
+from src.tvz_enhancer.data import html_parser
+from src.tvz_enhancer.data.records import FileRecord, NotificationRecord
+
+
+def extract_course_page(content: bytes, encoding: str = None):
+    """
+    Parses a raw course page into (files, notifications, reservation_link).
+    Only bytes and picklable records go in and out, so this can run in a
+    worker process.
+    """
+    markup = content.decode(encoding, errors="replace") if encoding else content
+    soup = html_parser.make_soup(markup, parse_only=html_parser.COURSE_PAGE)
+    return extract_files(soup), extract_notifications(soup), extract_reservation_link(soup)
+
+
+def extract_reservation_link(soup):
+    link_tags = soup.find_all('a', class_='nav-link mojtvzlink', onclick=True)
+    for link_tag in link_tags:
+        if 'Rezervacija labosa' in link_tag.get_text():
+            onclick_content = link_tag['onclick']
+            return parse_reservation_onclick(onclick_content)
+    return None
+
+
+def parse_reservation_onclick(onclick_content: str) -> str:
+    start_idx = onclick_content.find("'") + 1
+    end_idx = onclick_content.find("',", start_idx)
+    return onclick_content[start_idx:end_idx]
+
+
+def extract_notifications(soup) -> list:
+    notifications = []
+    notification_elements = soup.select('div.card-header')
+
+    for element in notification_elements:
+        try:
+            title = element.find('h5', class_='card-title').text.strip()
+            message = element.find_next_sibling('div', class_='card-body').text.strip()
+            time_raw = element.find('h6', class_='card-subtitle').text.strip()
+
+            notifications.append(make_notification_record(title, message, time_raw))
+        except Exception as e:
+            print(f"Error extracting notification: {e}")
+            continue
+
+    return notifications
+
+
+def extract_files(soup) -> list:
+    files = []
+
+    file_containers = soup.select('div.col-sm-3 div.shadow.p-3.mb-5.rounded')
+
+    for container in file_containers:
+        try:
+            section_variable = container.select_one('h5').get_text(strip=True)
+
+            list_items = container.select('li.list-group-item')
+            for item in list_items:
+                try:
+                    a_tags = item.find_all('a')
+                    if len(a_tags) < 2:
+                        raise ValueError("Didn't find two <a> tags in the snippet!")
+
+                    first_a = a_tags[0]
+                    second_a = a_tags[1]
+
+                    img_tag = first_a.find('img')
+                    type_variable = ""
+                    if img_tag and img_tag.has_attr("src"):
+                        type_variable = file_type_from_icon(img_tag["src"])
+
+                    files.append(make_file_record(type_variable, second_a.get('href', ''),
+                                                  second_a.get_text(strip=True), section_variable))
+
+                except Exception as e:
+                    print(f"Error extracting file details: {e}")
+                    continue
+
+        except Exception as e:
+            print(f"Error extracting section details: {e}")
+            continue
+
+    return files
+
+
+def make_notification_record(title: str, message: str, time_raw: str) -> NotificationRecord:
+    time_match = re.search(r'\d{1,2}\.\d{1,2}\.\d{4} u \d{1,2}h', time_raw)
+    time = time_match.group(0) if time_match else time_raw
+    return NotificationRecord(title, message, time)
+
+
+def file_type_from_icon(src: str) -> str:
+    filename = src.split('/')[-1]
+    return filename.split('.')[0]
+
+
+def make_file_record(type_variable: str, href: str, text: str, section: str) -> FileRecord:
+    """Builds a record from the file icon type, the download link and its "name [date]" text."""
+    extension = ""
+    if "skini/repoz" in href:
+        match = re.search(r"(skini/repoz)(.*)", href)
+        if match:
+            extension = match.group(2)
+        else:
+            extension = href
+    else:
+        extension = href
+
+    date_variable = ""
+    name_variable = text
+    match_date = re.search(r"\[([^]]+)\]", text)
+    if match_date:
+        date_variable = match_date.group(1)
+        name_variable = re.sub(r"\[[^]]+\]", "", name_variable).strip()
+
+    return FileRecord(name_variable, extension, type_variable, date_variable, section)
@@ -0,0 +1,39 @@
+import importlib.util
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+BACKENDS = ("lxml", "html.parser")
+
+
+def available_backends() -> list:
+    return [backend for backend in BACKENDS if backend == "html.parser" or importlib.util.find_spec(backend)]
+
+
+DEFAULT_BACKEND = available_backends()[0]
+
+
+def has_class(*class_names):
+    """
+    Class matcher usable in a SoupStrainer. While parsing, bs4 may hand over
+    the raw "a b c" attribute string instead of a list, so both are accepted.
+    """
+    wanted = set(class_names)
+
+    def match(value):
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return not wanted.isdisjoint(classes)
+
+    return match
+
+
+# Only the regions DataApiThread and ReservationThread actually query are kept.
+INDEX_PAGE = SoupStrainer(["p", "a"])
+COURSES_PAGE = SoupStrainer("div", class_=has_class("card-body"))
+COURSE_PAGE = SoupStrainer(["div", "a"], class_=has_class("card-header", "card-body", "col-sm-3", "mojtvzlink"))
+RESERVATION_PAGE = SoupStrainer("div", class_=has_class("card-default"))
+
+
+def make_soup(markup, parse_only=None, backend=None) -> BeautifulSoup:
+    return BeautifulSoup(markup, backend or DEFAULT_BACKEND, parse_only=parse_only)
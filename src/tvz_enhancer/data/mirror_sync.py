@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.tvz_enhancer.data.course_export import safe_name, unique_path
+from src.tvz_enhancer.data.download_writer import PreallocatedWriter
+
+MANIFEST_NAME = ".tvz_mirror.json"
+ARCHIVE_DIR = ".archive"
+MANIFEST_VERSION = 1
+
+ARCHIVE = "archive"
+DELETE = "delete"
+
+SyncResult = namedtuple("SyncResult", ["added", "updated", "removed", "unchanged", "failed"])
+
+
+class MirrorSync:
+    """
+    Keeps target as a course/section/file mirror of the scraped repository.
+    A manifest next to the files maps every repository id (the file's
+    extension) to its version (the scraped date), path, size and SHA-256, so
+    a run only compares records against it and transfers what is new or
+    changed. Files that disappeared from a course, and the previous versions
+    of changed files, are moved to .archive/<run time>/ or deleted.
+
+    Courses missing from the scrape (for example because their page could
+    not be fetched) are left alone.
+    """
+
+    def __init__(self, executor, url_for, filename_resolver, target: str, removed: str = ARCHIVE,
+                 max_workers: int = 4):
+        self.executor = executor
+        self.url_for = url_for
+        self.filename_resolver = filename_resolver
+        self.target = target
+        self.removed = removed
+        self.max_workers = max_workers
+        self.manifest_path = os.path.join(target, MANIFEST_NAME)
+        self.cancelled = threading.Event()
+        self._entries = {}
+        self._taken = set()
+        self._lock = threading.Lock()
+        self._archive_dir = None
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def sync(self, course_files: dict, verify: bool = False, progress=None) -> SyncResult:
+        """
+        course_files maps a course name to its FileRecords, as returned by the
+        scraper. verify also re-fetches files whose local copy is missing or
+        has the wrong size, which costs a stat per file. progress(done, total,
+        relative_path, error) is called after every transferred file.
+        """
+        os.makedirs(self.target, exist_ok=True)
+        self._entries = self._load_manifest()
+        self._archive_dir = os.path.join(self.target, ARCHIVE_DIR, time.strftime("%Y-%m-%d_%H%M%S"))
+
+        transfers, unchanged = self._plan(course_files, verify)
+        removed = self._remove_missing(course_files)
+
+        replaced = {file.extension for _, file in transfers}
+        self._taken = {entry['path'].lower() for key, entry in self._entries.items() if key not in replaced}
+
+        added = updated = failed = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mirror") as pool:
+                futures = {pool.submit(self._transfer, course_name, file): file for course_name, file in transfers}
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        file = futures[future]
+                        error = None
+                        try:
+                            relative_path, is_update = future.result()
+                            if is_update:
+                                updated += 1
+                            else:
+                                added += 1
+                        except Exception as e:
+                            relative_path = file.name
+                            print(f"Error syncing {file.name}: {e}")
+                            error = str(e)
+                            failed += 1
+
+                        if progress is not None:
+                            progress(done, len(transfers), relative_path, error)
+                        if self.cancelled.is_set():
+                            break
+                except BaseException:
+                    # Ctrl+C on the command line: let the running transfers stop at their next chunk.
+                    self.cancel()
+                    raise
+                finally:
+                    pool.shutdown(wait=True, cancel_futures=True)
+        finally:
+            self._save_manifest()
+
+        return SyncResult(added, updated, removed, unchanged, failed)
+
+    def _plan(self, course_files, verify):
+        transfers = []
+        unchanged = 0
+        for course_name, files in course_files.items():
+            for file in files:
+                if not file.downloadable:
+                    continue
+                entry = self._entries.get(file.extension)
+                if entry is None or entry['version'] != file.date or (verify and not self._intact(entry)):
+                    transfers.append((course_name, file))
+                else:
+                    unchanged += 1
+        return transfers, unchanged
+
+    def _intact(self, entry):
+        try:
+            return os.path.getsize(os.path.join(self.target, entry['path'])) == entry['size']
+        except OSError:
+            return False
+
+    def _remove_missing(self, course_files):
+        present = {file.extension for files in course_files.values() for file in files if file.downloadable}
+        missing = [key for key, entry in self._entries.items()
+                   if entry['course'] in course_files and key not in present]
+        for key in missing:
+            relative_path = self._entries.pop(key)['path']
+            self._retire(relative_path)
+            self._prune_empty(os.path.dirname(relative_path))
+        return len(missing)
+
+    def _transfer(self, course_name, file):
+        if self.cancelled.is_set():
+            raise IOError("Sync cancelled")
+
+        headers = {'Accept-Encoding': 'identity'}
+        with self.executor.get(self.url_for(file.extension), "download", stream=True, headers=headers) as response:
+            response.raise_for_status()
+            filename = self.filename_resolver(response, safe_name(file.name))
+            relative_path = os.path.join(safe_name(course_name), safe_name(file.section), safe_name(filename))
+            with self._lock:
+                relative_path = unique_path(relative_path, self._taken)
+
+            path = os.path.join(self.target, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".part"
+            hasher = hashlib.sha256()
+            total = int(response.headers.get('Content-Length', 0))
+            try:
+                with PreallocatedWriter(temp_path, 0, total, hasher) as writer:
+                    for _ in writer.stream(response):
+                        if self.cancelled.is_set():
+                            raise IOError("Sync cancelled")
+                if total and writer.written != total:
+                    raise IOError(f"Received {writer.written} of {total} bytes")
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+        with self._lock:
+            previous = self._entries.get(file.extension)
+            if previous is not None:
+                self._retire(previous['path'])
+            os.replace(temp_path, path)
+
+            self._entries[file.extension] = {
+                'course': course_name,
+                'section': file.section,
+                'name': file.name,
+                'version': file.date,
+                'path': relative_path,
+                'size': writer.written,
+                'sha256': hasher.hexdigest()
+            }
+            self._save_manifest()
+        return relative_path, previous is not None
+
+    def _retire(self, relative_path):
+        path = os.path.join(self.target, relative_path)
+        if not os.path.exists(path):
+            return
+        try:
+            if self.removed == ARCHIVE:
+                archived = os.path.join(self._archive_dir, relative_path)
+                os.makedirs(os.path.dirname(archived), exist_ok=True)
+                shutil.move(path, archived)
+            else:
+                os.remove(path)
+        except OSError as e:
+            print(f"Error removing {relative_path} from mirror: {e}")
+
+    def _prune_empty(self, relative_dir):
+        # Only called before any transfer starts, so no worker is about to write into these directories.
+        while relative_dir:
+            try:
+                os.rmdir(os.path.join(self.target, relative_dir))
+            except OSError:
+                return
+            relative_dir = os.path.dirname(relative_dir)
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data.get("entries", {})
+        except (OSError, json.JSONDecodeError, AttributeError):
+            pass
+        return {}
+
+    def _save_manifest(self):
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "entries": self._entries}, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            print(f"Error saving mirror manifest: {e}")
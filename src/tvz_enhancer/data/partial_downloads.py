@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+PART_SUFFIX = ".part"
+MANIFEST_SUFFIX = ".part.json"
+PENDING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pending_downloads.json')
+
+
+def part_path(save_path: str) -> str:
+    return save_path + PART_SUFFIX
+
+
+def manifest_path(save_path: str) -> str:
+    return save_path + MANIFEST_SUFFIX
+
+
+def buffer_path() -> str:
+    """A temporary save path for bytes that arrive before the user picked where the file goes."""
+    return os.path.join(tempfile.gettempdir(), f"tvz-download-{uuid.uuid4().hex}")
+
+
+def _write_json(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+
+
+def save_manifest(save_path: str, url: str, total: int, etag=None, last_modified=None, written: int = 0,
+                  key=None, version=None) -> None:
+    """
+    The sidecar next to the .part file. It records where the bytes came from,
+    the validators needed to ask the server for the rest with If-Range and
+    how many bytes of the (preallocated) .part file are actually written.
+    key and version are the file's repository id and scraped date; the url
+    carries the state of the session that started the download, so a resume
+    after a new login rebuilds it from key.
+    """
+    _write_json(manifest_path(save_path), {
+        'url': url,
+        'key': key,
+        'version': version,
+        'total': total,
+        'etag': etag,
+        'last_modified': last_modified,
+        'written': written
+    })
+
+
+def checkpoint(save_path: str, written: int) -> None:
+    manifest = load_manifest(save_path)
+    if manifest is not None:
+        manifest['written'] = written
+        _write_json(manifest_path(save_path), manifest)
+
+
+def load_manifest(save_path: str):
+    manifest = _read_json(manifest_path(save_path))
+    return manifest if isinstance(manifest, dict) else None
+
+
+def resume_offset(save_path: str, url: str, key=None) -> int:
+    """Bytes already on disk for url (or for the file key), 0 when there is nothing usable to resume."""
+    manifest = load_manifest(save_path)
+    if not manifest or not ((key is not None and manifest.get('key') == key) or manifest.get('url') == url):
+        return 0
+    try:
+        size = os.path.getsize(part_path(save_path))
+    except OSError:
+        return 0
+    # After a crash the preallocated file is larger than what was received.
+    written = manifest.get('written')
+    return min(size, written) if isinstance(written, int) else size
+
+
+def discard(save_path: str) -> None:
+    for path in (part_path(save_path), manifest_path(save_path)):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"Error removing partial download: {e}")
+
+
+def move(save_path: str, new_save_path: str) -> None:
+    """Moves a partial download (the .part file and its manifest) so it continues at new_save_path."""
+    discard(new_save_path)
+    for source, destination in ((part_path(save_path), part_path(new_save_path)),
+                                (manifest_path(save_path), manifest_path(new_save_path))):
+        if os.path.exists(source):
+            shutil.move(source, destination)
+
+
+def complete(save_path: str) -> None:
+    os.replace(part_path(save_path), save_path)
+    discard(save_path)
+
+
+class PendingRegistry:
+    """Save paths of downloads that have not finished yet, so they can be resumed after a restart."""
+
+    def __init__(self, path: str = PENDING_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def entries(self) -> list:
+        with self._lock:
+            data = _read_json(self.path)
+        return [entry for entry in data if isinstance(entry, str)] if isinstance(data, list) else []
+
+    def add(self, save_path: str) -> None:
+        with self._lock:
+            entries = _read_json(self.path) or []
+            if save_path not in entries:
+                entries.append(save_path)
+                self._write(entries)
+
+    def remove(self, save_path: str) -> None:
+        with self._lock:
+            entries = _read_json(self.path) or []
+            if save_path in entries:
+                entries.remove(save_path)
+                self._write(entries)
+
+    def _write(self, entries):
+        try:
+            _write_json(self.path, entries)
+        except OSError as e:
+            print(f"Error saving pending downloads: {e}")
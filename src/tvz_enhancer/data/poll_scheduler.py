@@ -0,0 +1,104 @@
+import random
+import threading
+import time
+
+
+class PollScheduler:
+    """
+    Decides which course pages are due for polling. Every course starts at
+    base_interval; a cycle without changes backs the course off towards
+    max_interval, a detected change pulls it back to min_interval. The course
+    the user is currently looking at is never polled less often than
+    focus_interval.
+    """
+
+    def __init__(self, base_interval: float = 500, min_interval: float = 60, max_interval: float = 1800,
+                 focus_interval: float = 30, backoff: float = 1.5, jitter: float = 0.15):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = min(max(base_interval, min_interval), max_interval)
+        self.focus_interval = focus_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self._courses = {}
+        self._focused_course = None
+        self._lock = threading.Lock()
+
+    def sync_courses(self, course_names) -> None:
+        """Adds newly enrolled courses (due immediately) and forgets removed ones."""
+        now = time.monotonic()
+        with self._lock:
+            for course_name in course_names:
+                if course_name not in self._courses:
+                    self._courses[course_name] = {
+                        'interval': self.base_interval,
+                        'next_due': now,
+                        'polls': 0,
+                        'changes': 0
+                    }
+
+            for course_name in list(self._courses):
+                if course_name not in course_names:
+                    del self._courses[course_name]
+
+    def due_courses(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [name for name, entry in self._courses.items() if entry['next_due'] <= now]
+
+    def record_result(self, course_name: str, changed: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._courses.get(course_name)
+            if entry is None:
+                return
+
+            entry['polls'] += 1
+            if changed:
+                entry['changes'] += 1
+                entry['interval'] = self.min_interval
+            else:
+                entry['interval'] = min(entry['interval'] * self.backoff, self.max_interval)
+
+            entry['next_due'] = now + self._effective_interval(course_name, entry)
+
+    def set_focused_course(self, course_name) -> None:
+        """Focuses course_name, or clears the focus when it is empty or None."""
+        now = time.monotonic()
+        with self._lock:
+            self._focused_course = course_name or None
+            entry = self._courses.get(course_name)
+            if entry is not None:
+                entry['next_due'] = min(entry['next_due'], now + self.focus_interval)
+
+    def mark_due(self, course_name=None) -> None:
+        """Makes one course, or every course when course_name is None, due right now."""
+        now = time.monotonic()
+        with self._lock:
+            for name, entry in self._courses.items():
+                if course_name is None or name == course_name:
+                    entry['next_due'] = now
+
+    def next_delay(self) -> float:
+        """Seconds until the next course becomes due."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._courses:
+                return self.base_interval
+            next_due = min(entry['next_due'] for entry in self._courses.values())
+
+        return min(max(next_due - now, 1.0), self.max_interval)
+
+    def change_rate(self, course_name: str) -> float:
+        with self._lock:
+            entry = self._courses.get(course_name)
+            if not entry or not entry['polls']:
+                return 0.0
+            return entry['changes'] / entry['polls']
+
+    def _effective_interval(self, course_name, entry) -> float:
+        interval = entry['interval']
+        if course_name == self._focused_course:
+            interval = min(interval, self.focus_interval)
+
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
@@ -0,0 +1,98 @@
+import threading
+
+from src.tvz_enhancer.data.diff_engine import ADDED, CHANGED, FILE
+from src.tvz_enhancer.data.download_manager import DONE_STATES
+
+
+class PrefetchPolicy:
+    """
+    Opt-in speculative download of newly published course files into the
+    BlobCache, so they open instantly once the user clicks them. Prefetches
+    run one at a time on the "prefetch" endpoint (the lowest rate limiter
+    priority), are throttled to max_rate bytes per second, skip files larger
+    than max_file_size and stop while the cache holds disk_budget bytes.
+    """
+
+    def __init__(self, download_manager, cache, url_for, enabled: bool = False, max_rate: float = 512 * 1024,
+                 max_file_size: int = 50 * 1024 * 1024, disk_budget: int = 256 * 1024 * 1024,
+                 max_active: int = 1):
+        self.download_manager = download_manager
+        self.cache = cache
+        self.url_for = url_for
+        self.enabled = enabled
+        self.max_rate = max_rate
+        self.max_file_size = max_file_size
+        self.disk_budget = disk_budget
+        self.max_active = max_active
+        self._queue = []
+        self._active = {}
+        self._lock = threading.Lock()
+        download_manager.job_state_changed.connect(self._on_job_state_changed)
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        if enabled:
+            self._start_next()
+            return
+
+        with self._lock:
+            self._queue.clear()
+            job_ids = list(self._active.values())
+        for job_id in job_ids:
+            self.download_manager.cancel(job_id)
+
+    def on_changes(self, events) -> None:
+        """Queues the downloadable files of a cycle's added or changed FILE events."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            queued = {file.extension for file in self._queue} | set(self._active)
+            for event in events:
+                file = event.item
+                if event.entity != FILE or event.kind not in (ADDED, CHANGED) or not file.downloadable:
+                    continue
+                if file.extension not in queued:
+                    queued.add(file.extension)
+                    self._queue.append(file)
+        self._start_next()
+
+    def take_over(self, extension):
+        """
+        The id of a running prefetch of the file, now unthrottled because the
+        user asked for it, or None.
+        """
+        with self._lock:
+            self._queue = [file for file in self._queue if file.extension != extension]
+            job_id = self._active.get(extension)
+        if job_id is not None:
+            self.download_manager.promote(job_id)
+        return job_id
+
+    def _start_next(self):
+        with self._lock:
+            while self.enabled and self._queue and len(self._active) < self.max_active:
+                if self.cache.total_size() >= self.disk_budget:
+                    self._queue.clear()
+                    return
+
+                file = self._queue.pop(0)
+                if self.cache.lookup(file.extension, file.date, touch=False) is not None:
+                    continue
+                # A cache download started by the user writes the same staging file.
+                if any(job.into_cache and job.cache_key == file.extension
+                       for job in self.download_manager.active_jobs()):
+                    continue
+                self._active[file.extension] = self.download_manager.enqueue_to_cache(
+                    self.url_for(file.extension), file.name, file.extension, file.date, endpoint="prefetch",
+                    max_rate=self.max_rate, max_size=self.max_file_size)
+
+    def _on_job_state_changed(self, job_id, state):
+        if state not in DONE_STATES:
+            return
+        with self._lock:
+            extension = next((key for key, value in self._active.items() if value == job_id), None)
+            if extension is None:
+                return
+            del self._active[extension]
+        self._start_next()
@@ -0,0 +1,104 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+# Priority classes, a lower number is served first.
+RESERVATION = 0
+INTERACTIVE = 1  # user-initiated downloads, login
+POLL = 2
+PREFETCH = 3  # speculative background downloads, only when nobody else is waiting
+PRIORITIES = (RESERVATION, INTERACTIVE, POLL, PREFETCH)
+
+
+class RateLimitTimeoutError(requests.RequestException):
+    pass
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every request to moj.tvz.hr. Waiting callers are
+    served strictly by priority class, reservations never wait for a token
+    (they borrow against the bucket instead) and while a reservation window
+    is open background polling and prefetching do not get any tokens at all.
+    """
+
+    def __init__(self, rate: float = 4.0, burst: int = 8):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiting = [0] * len(PRIORITIES)
+        self._window_until = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, priority: int = POLL, timeout: float = None, cancelled: threading.Event = None) -> bool:
+        """
+        Blocks until the caller may send one request. Returns False if timeout
+        seconds passed or cancelled was set first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        return False
+
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    wait = None
+                    if self._window_open(now) and priority >= POLL:
+                        wait = self._window_until - now
+                    elif not any(self._waiting[higher] for higher in range(priority)):
+                        if priority == RESERVATION or self._tokens >= 1:
+                            self._tokens -= 1
+                            return True
+                        wait = (1 - self._tokens) / self.rate
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    if cancelled is not None:
+                        # Nobody notifies the condition on cancellation, so poll for it.
+                        wait = 0.1 if wait is None else min(wait, 0.1)
+
+                    self._condition.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def open_window(self, duration: float) -> None:
+        """Starts (or extends) a reservation window during which polling is held back."""
+        with self._condition:
+            self._window_until = max(self._window_until, time.monotonic() + duration)
+            self._condition.notify_all()
+
+    def close_window(self) -> None:
+        with self._condition:
+            self._window_until = 0.0
+            self._condition.notify_all()
+
+    @contextmanager
+    def window(self, duration: float):
+        self.open_window(duration)
+        try:
+            yield self
+        finally:
+            self.close_window()
+
+    def window_open(self) -> bool:
+        with self._condition:
+            return self._window_open(time.monotonic())
+
+    def _window_open(self, now) -> bool:
+        return now < self._window_until
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from src.tvz_enhancer.utils import dates
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class FileRecord:
+    name: str
+    extension: str
+    type: str
+    date: str
+    section: str
+    date_value: datetime = field(init=False, default=None, repr=False)
+    sort_key: int = field(init=False, default=dates.MISSING_SORT_KEY, repr=False)
+    _hash: int = field(init=False, default=0, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'date_value', dates.parse(self.date, dates.FILE_DATE_FORMAT))
+        object.__setattr__(self, 'sort_key', dates.to_sort_key(self.date_value))
+        object.__setattr__(self, '_hash', hash(self._fields()))
+
+    def _fields(self):
+        return self.name, self.extension, self.type, self.date, self.section
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuilt through __init__ so the hash is recomputed; str hashes differ between processes.
+        return self.__class__, self._fields()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is not FileRecord:
+            return NotImplemented
+        return self._hash == other._hash and self._fields() == other._fields()
+
+    @property
+    def downloadable(self) -> bool:
+        return not self.extension.startswith("http")
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'extension': self.extension,
+            'type': self.type,
+            'date': self.date,
+            'section': self.section
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data.get('name', ''), data.get('extension', ''), data.get('type', ''),
+                   data.get('date', ''), data.get('section', ''))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class NotificationRecord:
+    title: str
+    message: str
+    time: str
+    time_value: datetime = field(init=False, default=None, repr=False)
+    sort_key: int = field(init=False, default=dates.MISSING_SORT_KEY, repr=False)
+    _hash: int = field(init=False, default=0, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'time_value', dates.parse(self.time, dates.NOTIFICATION_TIME_FORMAT))
+        object.__setattr__(self, 'sort_key', dates.to_sort_key(self.time_value))
+        object.__setattr__(self, '_hash', hash(self._fields()))
+
+    def _fields(self):
+        return self.title, self.message, self.time
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuilt through __init__ so the hash is recomputed; str hashes differ between processes.
+        return self.__class__, self._fields()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is not NotificationRecord:
+            return NotImplemented
+        return self._hash == other._hash and self._fields() == other._fields()
+
+    def to_dict(self) -> dict:
+        return {
+            'title': self.title,
+            'message': self.message,
+            'time': self.time
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data.get('title', ''), data.get('message', ''), data.get('time', ''))
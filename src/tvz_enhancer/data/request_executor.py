@@ -0,0 +1,240 @@
+import random
+import threading
+import time
+
+import requests
+
+from src.tvz_enhancer.data.rate_limiter import RateLimitTimeoutError, INTERACTIVE, POLL, PREFETCH
+
+
+class CircuitOpenError(requests.RequestException):
+    pass
+
+
+class DeadlineExceededError(requests.RequestException):
+    pass
+
+
+class RequestCancelledError(requests.RequestException):
+    pass
+
+
+class RetryPolicy:
+    def __init__(self, retries: int = 2, timeout: float = 10, base_delay: float = 0.5, max_delay: float = 8,
+                 retry_statuses=(429, 500, 502, 503, 504), cycle_bound: bool = True, priority: int = POLL,
+                 trips_breaker: bool = True):
+        self.retries = retries
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        # Only polling requests are limited by the deadline of the current polling cycle.
+        self.cycle_bound = cycle_bound
+        self.priority = priority
+        # A failed request only counts toward the circuit breaker if the policy says so.
+        self.trips_breaker = trips_breaker
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+DEFAULT_POLICIES = {
+    "page": RetryPolicy(retries=2, timeout=10),
+    # The index page read synchronously while the dashboard is built: fail fast instead of freezing the window.
+    "startup": RetryPolicy(retries=0, timeout=5, cycle_bound=False, priority=INTERACTIVE, trips_breaker=False),
+    "course": RetryPolicy(retries=2, timeout=10),
+    "download": RetryPolicy(retries=3, timeout=30, base_delay=1, max_delay=15, cycle_bound=False,
+                            priority=INTERACTIVE),
+    "prefetch": RetryPolicy(retries=1, timeout=30, base_delay=2, max_delay=15, cycle_bound=False,
+                            priority=PREFETCH)
+}
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60, max_reset_timeout: float = 900,
+                 on_state_change=None, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.on_state_change = on_state_change
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._current_timeout = reset_timeout
+        # The thread whose request is the single probe let through while half open.
+        self._probe_thread = None
+        self._clock = clock
+        self._lock = threading.RLock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self._current_timeout:
+                self._set_state(self.HALF_OPEN)
+            return self._state
+
+    def remaining_open_time(self) -> float:
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._current_timeout - (self._clock() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may go to the host. While half open only one request
+        at a time is let through as the probe; its retries are allowed again.
+        """
+        with self._lock:
+            state = self.state
+            if state == self.OPEN:
+                return False
+            if state == self.HALF_OPEN:
+                if self._probe_thread not in (None, threading.get_ident()):
+                    return False
+                self._probe_thread = threading.get_ident()
+            return True
+
+    def release_probe(self) -> None:
+        """Lets another request probe the host when this thread's probe ended without a verdict."""
+        with self._lock:
+            if self._probe_thread == threading.get_ident():
+                self._probe_thread = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._probe_thread = None
+            self._failures = 0
+            self._current_timeout = self.reset_timeout
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._probe_thread = None
+            self._failures += 1
+            if self._state == self.HALF_OPEN:
+                # The probe failed, stay away from the host for longer.
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self._opened_at = self._clock()
+        self._set_state(self.OPEN)
+
+    def _set_state(self, state):
+        if state == self._state:
+            return
+        self._state = state
+        if self.on_state_change:
+            self.on_state_change(state)
+
+
+class RequestExecutor:
+    """
+    Runs every moj.tvz.hr request through the per-endpoint retry policy, the
+    shared circuit breaker and the deadline budget of the current polling cycle.
+    The session is expected to be a SessionHandle; the policy's priority class
+    is passed on to the shared rate limiter.
+    """
+
+    def __init__(self, session_getter, breaker: CircuitBreaker = None, policies: dict = None, clock=time.monotonic):
+        self.session_getter = session_getter
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self._deadline = None
+        self._cancelled = threading.Event()
+        self._clock = clock
+
+    def cancel(self) -> None:
+        """Fails every further attempt and interrupts backoff sleeps, used on shutdown."""
+        self._cancelled.set()
+
+    def start_cycle(self, budget: float) -> None:
+        self._deadline = self._clock() + budget
+
+    def end_cycle(self) -> None:
+        self._deadline = None
+
+    def get(self, url, endpoint="page", **kwargs):
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def post(self, url, endpoint="page", **kwargs):
+        return self.request("POST", url, endpoint, **kwargs)
+
+    def request(self, method, url, endpoint="page", **kwargs):
+        policy = self.policies.get(endpoint, self.policies["page"])
+        try:
+            return self._request(method, url, policy, **kwargs)
+        finally:
+            # A cancelled, queued-out or non-tripping request says nothing about the host.
+            self.breaker.release_probe()
+
+    def _request(self, method, url, policy, **kwargs):
+        attempt = 0
+
+        while True:
+            if self._cancelled.is_set():
+                raise RequestCancelledError(f"Cancelled {method} {url}")
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(f"Circuit open, skipping {method} {url}")
+
+            kwargs['timeout'] = self._timeout(policy)
+            try:
+                response = self.session_getter().request(method, url, priority=policy.priority,
+                                                         wait=self._queue_wait(policy), cancelled=self._cancelled,
+                                                         **kwargs)
+            except RateLimitTimeoutError:
+                # Waiting for the rate limiter says nothing about the host, so the breaker is not touched.
+                if self._cancelled.is_set():
+                    raise RequestCancelledError(f"Cancelled {method} {url}")
+                raise DeadlineExceededError(f"No request slot for {method} {url} before the cycle deadline")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in policy.retry_statuses:
+                    self.breaker.record_success()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} for {url}", response=response)
+                response.close()
+
+            if attempt >= policy.retries:
+                self._record_failure(policy)
+                raise error
+
+            delay = policy.backoff(attempt)
+            deadline = self._deadline if policy.cycle_bound else None
+            if deadline is not None and self._clock() + delay >= deadline:
+                self._record_failure(policy)
+                raise error
+            if self._cancelled.wait(delay):
+                raise RequestCancelledError(f"Cancelled {method} {url}")
+            attempt += 1
+
+    def _record_failure(self, policy):
+        if policy.trips_breaker:
+            self.breaker.record_failure()
+
+    def _queue_wait(self, policy):
+        """How long a request may queue for the rate limiter, None means until it gets a slot."""
+        deadline = self._deadline if policy.cycle_bound else None
+        if deadline is None:
+            return None
+        return max(deadline - self._clock(), 0.0)
+
+    def _timeout(self, policy) -> float:
+        deadline = self._deadline if policy.cycle_bound else None
+        if deadline is None:
+            return policy.timeout
+
+        remaining = deadline - self._clock()
+        if remaining <= 0:
+            raise DeadlineExceededError("Polling cycle deadline exceeded")
+        return min(policy.timeout, remaining)
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import create_cookie
+from urllib3.util.retry import Retry
+
+from src.tvz_enhancer.data.rate_limiter import (RateLimiter, RateLimitTimeoutError, RESERVATION, INTERACTIVE, POLL,
+                                                PREFETCH)
+
+# Priority class of requests sent through a handle, unless the caller passes one explicitly.
+HANDLE_PRIORITIES = {
+    "reservation": RESERVATION,
+    "login": INTERACTIVE,
+    "download": INTERACTIVE,
+    "prefetch": PREFETCH
+}
+
+
+class SessionHandle:
+    """
+    What components get instead of a raw requests.Session. All handles share
+    the provider's session and therefore one cookie jar and one connection
+    pool; the name identifies the caller (scraping, download, reservation...)
+    and sets the priority class its requests get from the shared rate limiter.
+    """
+
+    def __init__(self, provider, name):
+        self._provider = provider
+        self.name = name
+        self.priority = HANDLE_PRIORITIES.get(name, POLL)
+
+    @property
+    def cookies(self):
+        return self._provider.session().cookies
+
+    def request(self, method, url, priority=None, wait=None, cancelled=None, **kwargs):
+        """
+        Sends the request once the rate limiter lets it through. wait limits how
+        long to queue for a token; RateLimitTimeoutError is raised when it runs
+        out or cancelled gets set.
+        """
+        if priority is None:
+            priority = self.priority
+        if not self._provider.rate_limiter.acquire(priority, timeout=wait, cancelled=cancelled):
+            raise RateLimitTimeoutError(f"No request slot for {method} {url}")
+        return self._provider.session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        return self.request("POST", url, data=data, **kwargs)
+
+
+class SessionProvider:
+    """
+    Owns the single pooled requests.Session used for moj.tvz.hr. Cookies are
+    loaded from cookies.json once and only reloaded when the file changes.
+    Every handle shares one RateLimiter, so polling, downloads and
+    reservations are throttled together.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, cookie_file="cookies.json", pool_size: int = 16, max_retries: int = 1):
+        self.cookie_file = cookie_file
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.state = None
+        self.rate_limiter = RateLimiter()
+        self._session = None
+        self._cookie_mtime = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def handle(self, name: str) -> SessionHandle:
+        return SessionHandle(self, name)
+
+    def load_cookies(self):
+        """Loads cookies.json into the shared session if it changed and returns the MOJ state."""
+        with self._lock:
+            if not os.path.exists(self.cookie_file):
+                return self.state
+
+            stat = os.stat(self.cookie_file)
+            mtime = (stat.st_mtime_ns, stat.st_size)
+            if mtime == self._cookie_mtime:
+                return self.state
+
+            with open(self.cookie_file, "r") as file:
+                cookies = json.load(file)
+
+            session = self.session()
+            session.cookies.clear()
+            self.state = None
+            for cookie in cookies:
+                session_cookie = create_cookie(
+                    name=cookie['name'],
+                    value=cookie['value'],
+                    domain=cookie['domain'],
+                    path=cookie['path'],
+                    secure=cookie['secure'],
+                    rest={'HttpOnly': cookie['httpOnly']}
+                )
+                session.cookies.set_cookie(session_cookie)
+
+                if cookie['name'].startswith("MOJ"):
+                    self.state = cookie['name']
+
+            self._cookie_mtime = mtime
+            return self.state
+
+    def reset(self) -> None:
+        """Drops the session and its cookies, used on logout."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._cookie_mtime = None
+            self.state = None
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        # Only connection failures are retried here, everything else is up to RequestExecutor.
+        retries = Retry(total=self.max_retries, connect=self.max_retries, read=0, status=0)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=retries,
+                              pool_block=False)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session
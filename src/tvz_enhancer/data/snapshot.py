@@ -0,0 +1,77 @@
+import json
+import os
+import time
+
+from src.tvz_enhancer.data.records import FileRecord, NotificationRecord
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraped_snapshot.json')
+
+
+def save_snapshot(courses: dict, reservation_links: dict, student_name: str = None,
+                  path: str = SNAPSHOT_PATH) -> None:
+    """
+    Writes the scraped state in the same per-course layout as courses_data.json.
+    courses maps a course name to {'files': [...], 'notifications': [...]}.
+    """
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": int(time.time()),
+        "student_name": student_name,
+        "courses": [
+            {
+                "name": course_name,
+                "files": [file.to_dict() for file in course.get("files", [])],
+                "notifications": [notification.to_dict() for notification in course.get("notifications", [])],
+                "reservation_link": reservation_links.get(course_name)
+            }
+            for course_name, course in courses.items()
+        ]
+    }
+
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except Exception as e:
+        print(f"Error saving snapshot: {e}")
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH):
+    """Returns (courses, reservation_links, student_name) or None when there is no usable snapshot."""
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error loading snapshot: {e}")
+        return None
+
+    if data.get("version") != SNAPSHOT_VERSION:
+        print(f"Ignoring snapshot with version {data.get('version')}")
+        return None
+
+    courses = {}
+    reservation_links = {}
+    for course in data.get("courses", []):
+        course_name = course.get("name", "")
+        courses[course_name] = {
+            "files": [FileRecord.from_dict(file) for file in course.get("files", [])],
+            "notifications": [NotificationRecord.from_dict(notification)
+                              for notification in course.get("notifications", [])]
+        }
+        if course.get("reservation_link"):
+            reservation_links[course_name] = course["reservation_link"]
+
+    return courses, reservation_links, data.get("student_name")
+
+
+def clear_snapshot(path: str = SNAPSHOT_PATH) -> None:
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        print(f"Error clearing snapshot: {e}")
@@ -0,0 +1,249 @@
+import codecs
+from html.parser import HTMLParser
+
+from src.tvz_enhancer.data import extraction
+from src.tvz_enhancer.data.diff_engine import FILE, NOTIFICATION
+
+RESERVATION_LINK = "reservation_link"
+
+VOID_ELEMENTS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source",
+                           "track", "wbr"))
+# Elements whose end tag is optional; a new sibling of the same kind closes the previous one.
+IMPLICITLY_CLOSED = frozenset(("li", "p", "option", "tr", "td", "th"))
+
+FILE_CONTAINER_CLASSES = frozenset(("shadow", "p-3", "mb-5", "rounded"))
+
+
+def _capture(depth):
+    return {'depth': depth, 'pieces': []}
+
+
+def _text(capture) -> str:
+    """Equivalent of bs4's element.text.strip()."""
+    return "".join(capture['pieces']).strip()
+
+
+def _stripped_text(capture) -> str:
+    """Equivalent of bs4's element.get_text(strip=True)."""
+    return "".join(piece.strip() for piece in capture['pieces'])
+
+
+class CoursePageParser(HTMLParser):
+    """
+    Incremental counterpart of extraction.extract_course_page. Markup is fed
+    in chunks and every file, notification and reservation link is available
+    from pop_items() as soon as its closing tag has been seen; only the stack
+    of currently open tags is kept, never a document tree.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._stack = []
+        self._text = []
+        self._captures = []
+        self._ready = []
+        self._container = None
+        self._section = None
+        self._section_capture = None
+        self._item = None
+        self._header = None
+        self._pending_header = None
+        self._body = None
+        self._reservation = None
+        self.reservation_link = None
+
+    def pop_items(self) -> list:
+        """Returns the (kind, item) tuples completed since the last call."""
+        items, self._ready = self._ready, []
+        return items
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        while self._stack:
+            self._pop()
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        attrs = dict(attrs)
+        class_list = (attrs.get('class') or "").split()
+
+        if tag in IMPLICITLY_CLOSED and self._stack and self._stack[-1][0] == tag:
+            self._pop()
+
+        if tag in VOID_ELEMENTS:
+            self._void_element(tag, attrs)
+            return
+
+        self._stack.append((tag, frozenset(class_list)))
+        self._open(tag, class_list, attrs, len(self._stack) - 1)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                while len(self._stack) > index:
+                    self._pop()
+                return
+
+    def handle_data(self, data):
+        if self._captures:
+            self._text.append(data)
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text = []
+        for capture in self._captures:
+            capture['pieces'].append(text)
+
+    def _start_capture(self, depth):
+        capture = _capture(depth)
+        self._captures.append(capture)
+        return capture
+
+    def _inside(self, tag, class_name) -> bool:
+        return any(open_tag == tag and class_name in classes for open_tag, classes in self._stack[:-1])
+
+    def _open(self, tag, class_list, attrs, depth):
+        classes = self._stack[-1][1]
+
+        if tag == 'div':
+            if self._container is None and FILE_CONTAINER_CLASSES <= classes and self._inside('div', 'col-sm-3'):
+                self._container = depth
+                self._section = None
+            elif self._header is None and 'card-header' in classes:
+                self._header = {'depth': depth, 'title': None, 'time': None}
+                self._pending_header = None
+            elif (self._body is None and 'card-body' in classes and self._pending_header is not None
+                  and self._pending_header['depth'] == depth):
+                self._body = self._start_capture(depth)
+
+        elif tag == 'h5':
+            if self._container is not None and self._section is None and self._section_capture is None:
+                self._section_capture = self._start_capture(depth)
+            elif self._header is not None and self._header['title'] is None and 'card-title' in classes:
+                self._header['title'] = self._start_capture(depth)
+
+        elif tag == 'h6':
+            if self._header is not None and self._header['time'] is None and 'card-subtitle' in classes:
+                self._header['time'] = self._start_capture(depth)
+
+        elif tag == 'li':
+            if self._container is not None and self._item is None and 'list-group-item' in classes:
+                self._item = {'depth': depth, 'links': 0, 'first_a': None, 'type': "", 'href': "", 'text': None}
+
+        elif tag == 'a':
+            if self._item is not None:
+                self._item['links'] += 1
+                if self._item['links'] == 1:
+                    self._item['first_a'] = depth
+                elif self._item['links'] == 2:
+                    self._item['href'] = attrs.get('href') or ""
+                    self._item['text'] = self._start_capture(depth)
+
+            if (self.reservation_link is None and self._reservation is None and 'onclick' in attrs
+                    and " ".join(class_list) == "nav-link mojtvzlink"):
+                self._reservation = {'onclick': attrs['onclick'] or "", 'text': self._start_capture(depth)}
+
+    def _void_element(self, tag, attrs):
+        item = self._item
+        if tag == 'img' and item is not None and item['first_a'] is not None and not item['type'] \
+                and attrs.get('src') is not None:
+            item['type'] = extraction.file_type_from_icon(attrs['src'])
+
+    def _pop(self):
+        tag, _ = self._stack.pop()
+        depth = len(self._stack)
+        self._captures = [capture for capture in self._captures if capture['depth'] < depth]
+
+        if self._section_capture is not None and self._section_capture['depth'] == depth:
+            self._section = _stripped_text(self._section_capture)
+            self._section_capture = None
+
+        item = self._item
+        if item is not None:
+            if item['first_a'] == depth:
+                item['first_a'] = None
+            if item['depth'] == depth:
+                self._item = None
+                self._finish_file(item)
+
+        if self._container == depth:
+            self._container = None
+            self._section = None
+
+        if self._header is not None and self._header['depth'] == depth:
+            header = self._header
+            self._header = None
+            if header['title'] is None or header['time'] is None:
+                print("Error extracting notification: card header without title or time")
+            else:
+                self._pending_header = {'depth': depth, 'title': _text(header['title']),
+                                        'time': _text(header['time'])}
+
+        if self._body is not None and self._body['depth'] == depth:
+            header = self._pending_header
+            self._ready.append((NOTIFICATION, extraction.make_notification_record(header['title'], _text(self._body),
+                                                                                  header['time'])))
+            self._body = None
+            self._pending_header = None
+        elif self._pending_header is not None and depth < self._pending_header['depth']:
+            print("Error extracting notification: card header without card body")
+            self._pending_header = None
+
+        if self._reservation is not None and self._reservation['text']['depth'] == depth:
+            reservation = self._reservation
+            self._reservation = None
+            if 'Rezervacija labosa' in "".join(reservation['text']['pieces']):
+                self.reservation_link = extraction.parse_reservation_onclick(reservation['onclick'])
+                self._ready.append((RESERVATION_LINK, self.reservation_link))
+
+    def _finish_file(self, item):
+        if item['links'] < 2:
+            print("Error extracting file details: Didn't find two <a> tags in the snippet!")
+            return
+        if self._section is None:
+            print("Error extracting section details: file list without a section title")
+            return
+
+        text = _stripped_text(item['text']) if item['text'] is not None else ""
+        self._ready.append((FILE, extraction.make_file_record(item['type'], item['href'], text, self._section)))
+
+
+def iter_course_page(chunks, encoding: str = None):
+    """
+    Yields (kind, item) tuples while chunks of a course page are still
+    arriving; kind is FILE, NOTIFICATION or RESERVATION_LINK.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    parser = CoursePageParser()
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        yield from parser.pop_items()
+
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.pop_items()
+
+
+def parse_course_page(chunks, encoding: str = None):
+    """Streaming equivalent of extraction.extract_course_page, returns (files, notifications, reservation_link)."""
+    files = []
+    notifications = []
+    reservation_link = None
+
+    for kind, item in iter_course_page(chunks, encoding):
+        if kind == FILE:
+            files.append(item)
+        elif kind == NOTIFICATION:
+            notifications.append(item)
+        elif kind == RESERVATION_LINK:
+            reservation_link = item
+
+    return files, notifications, reservation_link
@@ -0,0 +1,66 @@
+import hashlib
+import threading
+
+
+class ValidatorCache:
+    """
+    Remembers the HTTP validators (ETag / Last-Modified) and a body digest for
+    every scraped URL together with the result parsed from that body, so an
+    unchanged page can be answered without parsing it again.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def request_headers(self, url: str) -> dict:
+        with self._lock:
+            entry = self._entries.get(url)
+
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified(self, url: str, response):
+        """Returns the cached result for a 304 response, or None."""
+        if response.status_code != 304:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(url)
+        return entry['result'] if entry else None
+
+    def digest(self, body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def new_digest(self):
+        """Incremental hasher for bodies that are consumed as a stream; hexdigest() matches digest()."""
+        return hashlib.sha256()
+
+    def matching_result(self, url: str, digest: str):
+        """Returns the cached result when the body digest did not change, or None."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry and entry['digest'] == digest:
+            return entry['result']
+        return None
+
+    def store(self, url: str, response, digest: str, result) -> None:
+        with self._lock:
+            self._entries[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'digest': digest,
+                'result': result
+            }
+
+    def invalidate(self, url: str = None) -> None:
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
@@ -5,7 +5,7 @@ import requests
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
-    QLabel, QVBoxLayout, QWidget, QHBoxLayout, QScrollArea, QFrame, QMessageBox
+    QLabel, QVBoxLayout, QWidget, QHBoxLayout, QScrollArea, QFrame, QMessageBox, QFileDialog
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QUrl
 from PyQt6.QtGui import QFont, QMouseEvent, QDesktopServices
@@ -19,7 +19,7 @@ from src.tvz_enhancer.components.notification_tag import NotificationTag
 from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
-                             QScrollArea, QFrame)
+                             QScrollArea, QFrame, QCheckBox)
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QIcon, QPixmap, QColor
 from PyQt6.QtSvgWidgets import QSvgWidget
@@ -27,11 +27,36 @@ from PyQt6.QtSvg import QSvgRenderer
 import webbrowser
 
 from src.tvz_enhancer.data.data_api import DataApiThread
+from src.tvz_enhancer.data.diff_engine import ADDED, REMOVED, FILE
+from src.tvz_enhancer.data.course_export import FOLDER, ZIP
+from src.tvz_enhancer.data.download_manager import QUEUED, PAUSED, FINISHED, FAILED, DONE_STATES
+from src.tvz_enhancer.threads.export_thread import ExportThread
 
 import faulthandler
 
 faulthandler.enable()
 
+EXPORT_BUTTON_STYLE = """
+    QPushButton {
+        background-color: #181818;
+        color: #e5e5e5;
+        padding: 6px 12px;
+        border-radius: 6px;
+        font-size: 13px;
+    }
+    QPushButton:hover {
+        background-color: #252525;
+    }
+"""
+
+def format_size(num_bytes):
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
 class SvgIcon(QSvgWidget):
     def __init__(self, svg_path, size=16, color="#d3d3d3"):
         super().__init__(svg_path)
@@ -57,17 +82,48 @@ class SvgIcon(QSvgWidget):
         self.update_svg_renderer(QColor(color))
 
 class DocumentModule(QWidget):
-    def __init__(self):
+    course_focused = pyqtSignal(str)
+
+    def __init__(self, data_api=None):
         super().__init__()
         self.course_sections = {}
-
-        self.data_api_thread = DataApiThread()
-        student_name = self.data_api_thread.get_student_name()
+        self.file_widgets = {}
+        self.focused_course = None
+
+        self.data_api_thread = data_api or DataApiThread()
+        self.data_api_thread.ensure_session()
+
+        self.download_manager = self.data_api_thread.download_manager
+        self.download_jobs = {}
+        self.active_downloads = {}
+        self.file_status_labels = {}
+        self.open_jobs = set()
+        self.download_manager.save_path_requested.connect(self.on_save_path_requested)
+        self.download_manager.job_finished.connect(self.on_download_finished)
+        self.download_manager.job_progress.connect(self.on_download_progress)
+        self.download_manager.job_state_changed.connect(self.on_download_state_changed)
+        self.export_thread = None
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(15, 20, 20, 20)
         main_layout.setSpacing(20)
 
+        export_layout = QHBoxLayout()
+        self.export_status_label = QLabel("")
+        self.export_status_label.setStyleSheet("color: #9ca3af; font-size: 12px;")
+        self.export_all_button = QPushButton("Preuzmi sve predmete")
+        self.export_all_button.setStyleSheet(EXPORT_BUTTON_STYLE)
+        self.export_all_button.clicked.connect(lambda: self.export_courses())
+        self.prefetch_checkbox = QCheckBox("Automatski preuzimaj nove materijale")
+        self.prefetch_checkbox.setStyleSheet("color: #9ca3af; font-size: 12px;")
+        self.prefetch_checkbox.setChecked(self.data_api_thread.prefetch.enabled)
+        self.prefetch_checkbox.toggled.connect(self.data_api_thread.prefetch.set_enabled)
+        export_layout.addWidget(self.export_status_label)
+        export_layout.addStretch()
+        export_layout.addWidget(self.prefetch_checkbox)
+        export_layout.addWidget(self.export_all_button)
+        main_layout.addLayout(export_layout)
+
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
@@ -151,6 +207,11 @@ class DocumentModule(QWidget):
                 content_layout.setContentsMargins(16, 8, 16, 8)
                 content_layout.setSpacing(4)
 
+                export_button = QPushButton("Preuzmi cijeli predmet")
+                export_button.setStyleSheet(EXPORT_BUTTON_STYLE)
+                export_button.clicked.connect(lambda checked, name=course_name: self.export_courses(name))
+                content_layout.addWidget(export_button, 0, Qt.AlignmentFlag.AlignRight)
+
                 section_info = {
                     'frame': section,
                     'content': content_widget,
@@ -190,6 +251,18 @@ class DocumentModule(QWidget):
             file_widget = self.create_file_widget(file_info)
             if file_widget:
                 section_info['layout'].addWidget(file_widget)
+            return file_widget
+        return None
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.focused_course:
+            self.course_focused.emit(self.focused_course)
+
+    def hideEvent(self, event):
+        # Another module was opened, the expanded course is no longer in view.
+        super().hideEvent(event)
+        self.course_focused.emit("")
 
     def toggle_section(self, content_widget, header_button):
         try:
@@ -197,8 +270,13 @@ class DocumentModule(QWidget):
             chevron_icon = header_button.property("chevron_icon")
 
             if content_widget.isVisible():
+                self.focused_course = header_button.text()
+                self.course_focused.emit(self.focused_course)
                 new_icon = SvgIcon("../resources/chevron-up.svg", 16, "#d3d3d3")
             else:
+                if header_button.text() == self.focused_course:
+                    self.focused_course = None
+                    self.course_focused.emit("")
                 new_icon = SvgIcon("../resources/chevron-down.svg", 16, "#d3d3d3")
 
             header_button.layout().removeWidget(chevron_icon)
@@ -229,14 +307,15 @@ class DocumentModule(QWidget):
             inner_layout.setSpacing(4)
             inner_layout.setContentsMargins(0, 0, 0, 0)
 
-            name_label = QLabel(file["name"])
+            name_label = QLabel(file.name)
             name_label.setStyleSheet("color: white; font-size: 14px; margin: 0; padding: 0;")
 
             details_layout = QHBoxLayout()
             details_layout.setSpacing(5)
             details_layout.setContentsMargins(0, 0, 0, 0)
-            type_date_label = QLabel(f"{file['type']} • {file['date']}")
+            type_date_label = QLabel(f"{file.type} • {file.date}")
             type_date_label.setStyleSheet("color: #9ca3af; font-size: 12px; margin: 0; padding: 0;")
+            self.file_status_labels[file.extension] = (type_date_label, type_date_label.text())
             details_layout.addWidget(type_date_label)
             details_layout.addStretch()
 
@@ -245,50 +324,58 @@ class DocumentModule(QWidget):
 
             info_layout.addLayout(inner_layout)
 
-            action_button = QPushButton()
-            action_button.setFixedSize(28, 28)
-            action_button.setStyleSheet("QPushButton { background-color: transparent; border: none; }")
-
-            is_downloadable = file.get('download', False)
-            icon_widget = SvgIcon("../resources/download.svg" if is_downloadable else "../resources/external-link.svg",
-                                  16, "#d3d3d3")
-
-            button_layout = QHBoxLayout(action_button)
-            button_layout.setContentsMargins(6, 6, 6, 6)
-            button_layout.addWidget(icon_widget)
+            def create_icon_button(svg_path):
+                button = QPushButton()
+                button.setFixedSize(28, 28)
+                button.setStyleSheet("QPushButton { background-color: transparent; border: none; }")
+
+                icon_widget = SvgIcon(svg_path, 16, "#d3d3d3")
+                button_layout = QHBoxLayout(button)
+                button_layout.setContentsMargins(6, 6, 6, 6)
+                button_layout.addWidget(icon_widget)
+
+                def on_button_hover(event):
+                    if event.type() == event.Type.Enter:
+                        button.setStyleSheet(
+                            "QPushButton { background-color: #ffffff; border: none; border-radius: 6px; }")
+                        icon_widget.set_color("#000000")
+                    else:
+                        button.setStyleSheet(
+                            "QPushButton { background-color: transparent; border: none; border-radius: 6px;}")
+                        icon_widget.set_color("#d3d3d3")
+
+                button.enterEvent = on_button_hover
+                button.leaveEvent = on_button_hover
+                button.hide()
+                return button
+
+            is_downloadable = file.downloadable
+            buttons = []
+            if is_downloadable:
+                open_button = create_icon_button("../resources/document.svg")
+                open_button.clicked.connect(lambda checked, f=file: self.open_file(f.extension, f.name, f.date))
+                buttons.append(open_button)
 
-            action_button.hide()
+            action_button = create_icon_button(
+                "../resources/download.svg" if is_downloadable else "../resources/external-link.svg")
+            buttons.append(action_button)
 
             if is_downloadable:
                 action_button.clicked.connect(lambda checked, f=file:
-                                              self.download_file(f['extension'], f['name']))
+                                              self.download_file(f.extension, f.name, f.date))
             else:
-                action_button.clicked.connect(lambda: self.open_link(file.get('extension', '')))
-
-            def on_button_hover(event):
-                if event.type() == event.Type.Enter:
-                    action_button.setStyleSheet(
-                        "QPushButton { background-color: #ffffff; border: none; border-radius: 6px; }")
-                    icon_widget.set_color("#000000")
-                else:
-                    action_button.setStyleSheet(
-                        "QPushButton { background-color: transparent; border: none; border-radius: 6px;}")
-                    icon_widget.set_color("#d3d3d3")
+                action_button.clicked.connect(lambda: self.open_link(file.extension))
 
             def on_widget_hover(event):
-                if event.type() == event.Type.Enter:
-                    action_button.show()
-                else:
-                    action_button.hide()
+                for button in buttons:
+                    button.setVisible(event.type() == event.Type.Enter)
 
             widget.enterEvent = on_widget_hover
             widget.leaveEvent = on_widget_hover
 
-            action_button.enterEvent = on_button_hover
-            action_button.leaveEvent = on_button_hover
-
             layout.addLayout(info_layout)
-            layout.addWidget(action_button)
+            for button in buttons:
+                layout.addWidget(button)
             return widget
         except Exception as e:
             print(f"Error during create_file_widget: {e}")
@@ -303,22 +390,37 @@ class DocumentModule(QWidget):
     def add_new_file(self, file_data):
         course_name = list(file_data.keys())[0]
         file_info = file_data[course_name]
-        file_info['download'] = not file_info.get('extension', '').startswith("http")
 
         if course_name not in self.course_sections:
-            new_course = {
-                "name": course_name,
-                "categories": [
-                    {
-                        "name": file_info["section"],
-                        "files": [file_info]
-                    }
-                ]
-            }
-            self.add_course_section(new_course)
-        else:
-            self.add_category_to_section(course_name, file_info["section"])
-            self.add_file_to_category(course_name, file_info["section"], file_info)
+            self.add_course_section({"name": course_name, "categories": []})
+
+        self.add_category_to_section(course_name, file_info.section)
+        return self.add_file_to_category(course_name, file_info.section, file_info)
+
+    def remove_file(self, key):
+        file_widget = self.file_widgets.pop(key, None)
+        if file_widget:
+            file_widget.setParent(None)
+            file_widget.deleteLater()
+
+    def apply_changes(self, events):
+        file_events = [event for event in events if event.entity == FILE]
+        if not file_events:
+            return
+
+        self.setUpdatesEnabled(False)
+        try:
+            for event in file_events:
+                if event.kind != ADDED:
+                    self.remove_file(event.key)
+                if event.kind != REMOVED:
+                    file_widget = self.add_new_file({event.course: event.item})
+                    if file_widget:
+                        self.file_widgets[event.key] = file_widget
+        except Exception as e:
+            print(f"Error applying file changes: {e}")
+        finally:
+            self.setUpdatesEnabled(True)
 
     def course_data(self):
         return []
@@ -330,8 +432,127 @@ class DocumentModule(QWidget):
             total += file_count
         return total
 
-    def download_file(self, extension, filename):
+    def download_file(self, extension, filename, version=None):
+        try:
+            # A second click on a file that is still downloading cancels it.
+            job_id = self.active_downloads.get(extension)
+            if job_id is not None:
+                self.download_manager.cancel(job_id)
+                return
+
+            job_id = self.data_api_thread.download_file(extension, filename, version)
+            self.download_jobs[job_id] = extension
+            self.active_downloads[extension] = job_id
+        except Exception as e:
+            print(f"Error during file download: {e}")
+
+    def open_file(self, extension, filename, version=None):
         try:
-            self.data_api_thread.download_file(extension, filename)
+            # Cached copies open straight away, even without a connection.
+            path = self.data_api_thread.cached_file(extension, version)
+            if path:
+                QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+                return
+            if extension in self.active_downloads:
+                return
+
+            job_id = self.data_api_thread.cache_file(extension, filename, version)
+            self.download_jobs[job_id] = extension
+            self.active_downloads[extension] = job_id
+            self.open_jobs.add(job_id)
         except Exception as e:
-            print(f"Error during file download: {e}")
\ No newline at end of file
+            print(f"Error opening file: {e}")
+
+    def on_download_finished(self, job_id, path):
+        if job_id in self.open_jobs:
+            self.open_jobs.discard(job_id)
+            QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+
+    def on_save_path_requested(self, job_id, filename):
+        save_path, _ = QFileDialog.getSaveFileName(self, 'Save File As', filename)
+        self.download_manager.set_save_path(job_id, save_path)
+
+    def on_download_progress(self, job_id, downloaded, total, throughput, eta):
+        parts = [f"{downloaded * 100 // total}%" if total else format_size(downloaded)]
+        if throughput > 0:
+            parts.append(f"{format_size(throughput)}/s")
+        if eta >= 0:
+            parts.append(f"još {int(eta)} s")
+        self.set_file_status(self.download_jobs.get(job_id), " • ".join(parts))
+
+    def on_download_state_changed(self, job_id, state):
+        if state in DONE_STATES:
+            if state != FINISHED:
+                self.open_jobs.discard(job_id)
+            extension = self.download_jobs.pop(job_id, None)
+            self.active_downloads.pop(extension, None)
+            statuses = {FINISHED: "preuzeto", FAILED: "greška pri preuzimanju"}
+            self.set_file_status(extension, statuses.get(state))
+        elif state == PAUSED:
+            self.set_file_status(self.download_jobs.get(job_id), "pauzirano")
+        elif state == QUEUED:
+            self.set_file_status(self.download_jobs.get(job_id), "na čekanju")
+
+    def set_file_status(self, extension, status):
+        label, default_text = self.file_status_labels.get(extension, (None, None))
+        if label is None:
+            return
+        try:
+            label.setText(default_text if status is None else f"{default_text} • {status}")
+        except RuntimeError:
+            # The file widget was replaced by a newer scrape in the meantime.
+            self.file_status_labels.pop(extension, None)
+
+    def export_courses(self, course_name=None):
+        # Clicking again while an export is running cancels it.
+        if self.export_thread is not None and self.export_thread.isRunning():
+            self.export_thread.stop()
+            return
+
+        course_files = self.data_api_thread.course_files(course_name)
+        if not any(file.downloadable for files in course_files.values() for file in files):
+            QMessageBox.information(self, "Preuzimanje", "Nema datoteka za preuzimanje.")
+            return
+
+        box = QMessageBox(self)
+        box.setWindowTitle("Preuzimanje")
+        box.setText("Spremiti datoteke kao ZIP arhivu ili u mapu?")
+        zip_button = box.addButton("ZIP arhiva", QMessageBox.ButtonRole.AcceptRole)
+        folder_button = box.addButton("Mapa", QMessageBox.ButtonRole.AcceptRole)
+        box.addButton("Odustani", QMessageBox.ButtonRole.RejectRole)
+        box.exec()
+
+        if box.clickedButton() == zip_button:
+            target, _ = QFileDialog.getSaveFileName(self, 'Save Archive As', f"{course_name or 'predmeti'}.zip",
+                                                    "ZIP (*.zip)")
+            mode = ZIP
+        elif box.clickedButton() == folder_button:
+            target = QFileDialog.getExistingDirectory(self, 'Select Folder')
+            mode = FOLDER
+        else:
+            return
+        if not target:
+            return
+
+        self.export_thread = ExportThread(self.data_api_thread, course_files, target, mode)
+        self.export_thread.progressChanged.connect(self.on_export_progress)
+        self.export_thread.exportFinished.connect(self.on_export_finished)
+        self.export_thread.exportFailed.connect(self.on_export_failed)
+        self.export_all_button.setText("Prekini preuzimanje")
+        self.export_status_label.setText("Preuzimanje...")
+        self.export_thread.start()
+
+    def on_export_progress(self, done, total, relative_path):
+        self.export_status_label.setText(f"Preuzeto {done}/{total} • {os.path.basename(relative_path)}")
+
+    def on_export_finished(self, target, exported, failed):
+        self.export_all_button.setText("Preuzmi sve predmete")
+        status = f"Preuzeto {exported} datoteka u {target}"
+        if failed:
+            status += f" ({failed} neuspješno)"
+        self.export_status_label.setText(status)
+
+    def on_export_failed(self, error):
+        self.export_all_button.setText("Preuzmi sve predmete")
+        self.export_status_label.setText("Preuzimanje prekinuto" if error == "cancelled" else
+                                         f"Greška pri preuzimanju: {error}")
@@ -10,6 +10,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt, QDate, QSize
+from src.tvz_enhancer.utils import dates
 from src.tvz_enhancer.utils.local_storage import load_local_events
 
 
@@ -339,18 +340,16 @@ class HomeModule(QWidget):
 
             display_time = time_str
             if " u " not in time_str:
-                try:
-                    dt = datetime.strptime(time_str, "%Y-%m-%d %H:%M")
+                dt = dates.parse(time_str, dates.EVENT_TIME_FORMAT)
+                if dt is not None:
                     display_time = f"{dt.day}.{dt.month}.{dt.year} u {dt.hour}h"
-                except:
-                    pass
 
             item = NotificationItem(subject, title, message, display_time)
             self.notifications_card.add_item(item)
 
     def load_upcoming_events(self):
         all_data = load_local_events()
-        now = datetime.now()
+        now = dates.to_sort_key(datetime.now())
         result_list = []
 
         for date_str, events in all_data.items():
@@ -358,29 +357,23 @@ class HomeModule(QWidget):
                 start_str = e.get("Vrijeme početka", "")
                 if not start_str:
                     continue
-                try:
-                    start_dt = datetime.strptime(start_str, "%Y-%m-%d %H:%M")
-                except ValueError:
+                start_dt = dates.parse(start_str, dates.EVENT_TIME_FORMAT)
+                if start_dt is None:
                     continue
-                if start_dt > now:
+                start_key = dates.to_sort_key(start_dt)
+                if start_key > now:
                     qdate = QDate(start_dt.year, start_dt.month, start_dt.day)
                     time_str = start_dt.strftime("%H:%M")
                     title = e.get("Naziv", "Neimenovani događaj")
                     course = e.get("Lokacija", "N/A")
                     tip = e.get("Tip", "").lower()
                     event_type = self.map_event_type(tip)
-                    result_list.append((title, course, qdate, event_type, time_str))
+                    result_list.append((start_key, title, course, qdate, event_type, time_str))
 
-        events_with_dt = []
-        for (title, course, qd, et, time_str) in result_list:
-            dt = datetime(qd.year(), qd.month(), qd.day())
-            events_with_dt.append((dt, title, course, qd, et, time_str))
-
-        events_with_dt.sort(key=lambda x: x[0])
-        events_with_dt = events_with_dt[:4]
+        result_list.sort(key=lambda x: x[0])
 
         final_list = []
-        for (_, title, course, qdate, etype, time_str) in events_with_dt:
+        for (_, title, course, qdate, etype, time_str) in result_list[:4]:
             final_list.append((title, course, qdate, etype, time_str))
 
         return final_list
@@ -6,12 +6,14 @@ from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from src.tvz_enhancer.components.flow_layout import FlowLayout
 from src.tvz_enhancer.components.notification_item import NotificationItem
 from src.tvz_enhancer.components.notification_tag import NotificationTag
+from src.tvz_enhancer.data.diff_engine import ADDED, REMOVED, NOTIFICATION
 
 
 class NotificationModule(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.notifications = []
+        self.notification_items = {}
         self.active_tag = "all"
         self.tag_buttons = {}
         self.tags = []
@@ -145,18 +147,51 @@ class NotificationModule(QWidget):
 
         self.filter_notifications()
 
-    def add_notification(self, notification):
+    def add_notification(self, notification, refresh_home=True):
+        item = None
         for predmet, vrijednosti in notification.items():
             if predmet not in self.tags:
                 self.tags.insert(0, predmet)
                 self.create_tag_button(predmet)
 
-            notification = NotificationItem(vrijednosti["title"], vrijednosti["message"], predmet, vrijednosti["time"], 150)
-            self.notifications.insert(0, notification)
-            self.notifications_layout.insertWidget(0, notification)
+            item = NotificationItem(vrijednosti.title, vrijednosti.message, predmet, vrijednosti.time, 150)
+            self.notifications.insert(0, item)
+            self.notifications_layout.insertWidget(0, item)
+
+        if refresh_home and hasattr(self, 'home_module') and self.home_module:
+            self.home_module.refresh_recent_notifications()
+        return item
+
+    def remove_notification(self, key):
+        item = self.notification_items.pop(key, None)
+        if item:
+            if item in self.notifications:
+                self.notifications.remove(item)
+            self.notifications_layout.removeWidget(item)
+            item.deleteLater()
+
+    def apply_changes(self, events):
+        notification_events = [event for event in events if event.entity == NOTIFICATION]
+        if not notification_events:
+            return
 
-            if hasattr(self, 'home_module') and self.home_module:
-                self.home_module.refresh_recent_notifications()
+        self.notifications_frame.setUpdatesEnabled(False)
+        try:
+            for event in notification_events:
+                if event.kind != ADDED:
+                    self.remove_notification(event.key)
+                if event.kind != REMOVED:
+                    item = self.add_notification({event.course: event.item}, refresh_home=False)
+                    if item:
+                        self.notification_items[event.key] = item
+            self.filter_notifications()
+        except Exception as e:
+            print(f"Error applying notification changes: {e}")
+        finally:
+            self.notifications_frame.setUpdatesEnabled(True)
+
+        if hasattr(self, 'home_module') and self.home_module:
+            self.home_module.refresh_recent_notifications()
 
     def filter_notifications(self, text=None):
         search_text = self.search_bar.text().lower()
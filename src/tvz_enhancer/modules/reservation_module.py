@@ -703,8 +703,12 @@ class ReservationModule(QWidget):
 
     def set_courses(self, courses_dict):
         for course_name, course_link in courses_dict.items():
-            self.available_courses.append(course_name)
-            self.courses_links.append(course_link)
+            index = self.find_link_from_course(course_name)
+            if index == -1:
+                self.available_courses.append(course_name)
+                self.courses_links.append(course_link)
+            else:
+                self.courses_links[index] = course_link
 
     def find_link_from_course(self, course_name):
         try:
@@ -6,6 +6,8 @@ from PyQt6.QtWidgets import (
 from src.tvz_enhancer.components.active_screen import ActiveScreen
 from src.tvz_enhancer.components.main_navigation import MainNavigation
 from src.tvz_enhancer.data.data_api import DataApiThread
+from src.tvz_enhancer.data.session_provider import SessionProvider
+from src.tvz_enhancer.data.snapshot import clear_snapshot
 from src.tvz_enhancer.modules.home_module import HomeModule
 
 
@@ -19,7 +21,9 @@ class DashboardScene(QWidget):
         self.main_layout_frame = None
 
         self.dataApi = DataApiThread()
-        self.student_name = self.dataApi.get_student_name()
+        # With a snapshot the dashboard is built without waiting for moj.tvz.hr; the
+        # first polling cycle corrects the name through student_name_changed.
+        self.student_name = self.dataApi.student_name or self.dataApi.get_student_name()
 
         if not self.student_name:
             self.login_is = False
@@ -31,6 +35,23 @@ class DashboardScene(QWidget):
             self.main_layout_frame.hide()
 
         self.dataApi.first_load_signal.connect(self.on_first_load)
+        self.dataApi.session_expired.connect(self.on_session_expired)
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+        # Started last: a warm start from the snapshot emits first_load_signal right away.
+        self.dataApi.start()
+
+    def shutdown(self):
+        self.dataApi.stop()
+        self.dataApi.wait(2000)
+
+    def on_session_expired(self):
+        # Built from the snapshot, the dashboard would otherwise keep showing stale data of a dead session.
+        self.dataApi.stop()
+        self.dataApi.wait()
+        clear_snapshot()
+        SessionProvider.instance().reset()
+        if self.app_manager:
+            self.app_manager.switch_to("login")
 
     def on_first_load(self, loaded):
         if loaded and self.main_layout_frame:
@@ -38,12 +59,15 @@ class DashboardScene(QWidget):
 
     def init_ui(self):
         activeScreen = ActiveScreen(HomeModule())
-        self.navigation = MainNavigation(activeScreen, self.app_manager, self.student_name)
+        self.active_screen = activeScreen
+        self.navigation = MainNavigation(activeScreen, self.app_manager, self.student_name, self.dataApi)
 
-        self.dataApi.notification_updated.connect(self.navigation.notification_module.add_notification)
-        self.dataApi.files_updated.connect(self.navigation.document_module.add_new_file)
+        self.dataApi.changes_updated.connect(self.navigation.notification_module.apply_changes)
+        self.dataApi.changes_updated.connect(self.navigation.document_module.apply_changes)
         self.dataApi.reservation_links_signal.connect(self.navigation.reservation_module.add_crucial_data)
-        self.dataApi.start()
+        self.navigation.document_module.course_focused.connect(self.dataApi.set_focused_course)
+        self.dataApi.connection_state_changed.connect(self.active_screen.set_connection_state)
+        self.dataApi.student_name_changed.connect(self.navigation.set_student_name)
 
         dashboard_layout = QVBoxLayout(self)
         dashboard_layout.setContentsMargins(0, 0, 0, 0)
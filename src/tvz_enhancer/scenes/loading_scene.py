@@ -52,7 +52,9 @@ class LoadingScene(QWidget):
 
             self.dashboard_scene.dataApi.first_load_signal.connect(self._on_first_data_load)
 
-            if not self.dashboard_scene.dataApi.first_load:
+            if self.dashboard_scene.dataApi.first_load:
+                self._on_first_data_load(True)
+            else:
                 print("Waiting for initial data load...")
 
         except Exception as e:
@@ -0,0 +1,60 @@
+"""
+Mirrors every course repository into a local directory without starting the GUI.
+
+    python -m src.tvz_enhancer.sync TARGET [--course NAME ...] [--delete] [--verify] [--workers N]
+
+Uses the session saved by the last login through the app (cookies.json).
+Only new or changed files are downloaded; files that were removed from a
+course are moved to TARGET/.archive/, or deleted with --delete.
+"""
+import argparse
+import sys
+
+from src.tvz_enhancer.data.data_api import DataApiThread
+from src.tvz_enhancer.data.mirror_sync import MirrorSync, ARCHIVE, DELETE
+
+
+def print_progress(done, total, relative_path, error):
+    status = f"failed: {error}" if error else "ok"
+    print(f"[{done}/{total}] {relative_path} {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mirror the moj.tvz.hr course repositories into a directory.")
+    parser.add_argument("target")
+    parser.add_argument("--course", action="append", help="only this course (can be repeated)")
+    parser.add_argument("--delete", action="store_true", help="delete removed files instead of archiving them")
+    parser.add_argument("--verify", action="store_true", help="re-fetch files that are missing or have the wrong size")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    data_api = DataApiThread()
+    try:
+        data_api.ensure_session()
+        if not data_api.state:
+            print("Not logged in, log in through the app first.")
+            return 1
+
+        course_info = data_api.get_course_info()
+        if course_info is None:
+            print("Could not load the course list.")
+            return 1
+        files, _, _ = course_info
+        if args.course:
+            files = {name: course_files for name, course_files in files.items() if name in args.course}
+
+        mirror = MirrorSync(data_api.executor, data_api.download_url, data_api.determine_filename, args.target,
+                            removed=DELETE if args.delete else ARCHIVE, max_workers=args.workers)
+        result = mirror.sync(files, verify=args.verify, progress=print_progress)
+        print(f"{result.added} added, {result.updated} updated, {result.removed} removed, "
+              f"{result.unchanged} unchanged, {result.failed} failed")
+        return 1 if result.failed else 0
+    except KeyboardInterrupt:
+        print("Cancelled.")
+        return 1
+    finally:
+        data_api.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.tvz_enhancer.data.course_export import CourseExporter, ExportCancelled, FOLDER
+
+
+class ExportThread(QThread):
+    progressChanged = pyqtSignal(int, int, str)
+    exportFinished = pyqtSignal(str, int, int)
+    exportFailed = pyqtSignal(str)
+
+    def __init__(self, data_api, course_files, target, mode=FOLDER, max_workers=4, parent=None):
+        super().__init__(parent)
+        self.course_files = course_files
+        self.target = target
+        self.mode = mode
+        self.exporter = CourseExporter(data_api.executor, data_api.download_url, data_api.determine_filename,
+                                       max_workers=max_workers)
+
+    def stop(self):
+        self.exporter.cancel()
+
+    def run(self):
+        try:
+            exported, failed = self.exporter.export(self.course_files, self.target, self.mode, self._on_progress)
+            self.exportFinished.emit(self.target, exported, failed)
+        except ExportCancelled:
+            self.exportFailed.emit("cancelled")
+        except Exception as e:
+            print(f"Error exporting courses: {e}")
+            self.exportFailed.emit(str(e))
+
+    def _on_progress(self, done, total, relative_path, error):
+        self.progressChanged.emit(done, total, relative_path)
@@ -3,7 +3,14 @@ import requests
 import time
 from PyQt6.QtCore import QThread, pyqtSignal, QTime, QDateTime
 from PyQt6.QtWidgets import QApplication
-from bs4 import BeautifulSoup
+
+from src.tvz_enhancer.data import html_parser
+from src.tvz_enhancer.data.session_provider import SessionProvider
+
+# The reservation window holds background polling back from WINDOW_LEAD seconds
+# before the target time until the reservation is done, at most WINDOW_DURATION.
+WINDOW_LEAD = 10
+WINDOW_DURATION = 60
 
 
 class ReservationThread(QThread):
@@ -18,6 +25,8 @@ class ReservationThread(QThread):
         self.link = link
         self._status = "unactive"
         self._running = True
+        self.rate_limiter = SessionProvider.instance().rate_limiter
+        self._window_opened = False
         self.statusChanged.emit(self._status)
 
     def set_status(self, new_status):
@@ -33,6 +42,17 @@ class ReservationThread(QThread):
             self.terminate()
 
     def run(self):
+        try:
+            self._run()
+        finally:
+            if self._window_opened:
+                self.rate_limiter.close_window()
+
+    def open_window(self, duration):
+        self._window_opened = True
+        self.rate_limiter.open_window(duration)
+
+    def _run(self):
         try:
             current_time = QTime.currentTime()
 
@@ -45,6 +65,8 @@ class ReservationThread(QThread):
             else:
                 while current_time < self.target_time and self._running:
                     remaining_seconds = current_time.secsTo(self.target_time)
+                    if remaining_seconds <= WINDOW_LEAD:
+                        self.open_window(remaining_seconds + WINDOW_DURATION)
                     time.sleep(min(remaining_seconds, 1))
                     current_time = QTime.currentTime()
 
@@ -52,6 +74,7 @@ class ReservationThread(QThread):
                 self.set_status("unactive")
                 return
 
+            self.open_window(WINDOW_DURATION)
             self.set_status("active")
 
             try:
@@ -59,7 +82,7 @@ class ReservationThread(QThread):
                 response = self.session.post(self.link, data=form_data)
                 response.raise_for_status()
 
-                soup = BeautifulSoup(response.text, "html.parser")
+                soup = html_parser.make_soup(response.text, parse_only=html_parser.RESERVATION_PAGE)
                 cards = soup.find_all("div", class_="card card-default")
 
                 if not cards:
@@ -89,7 +112,7 @@ class ReservationThread(QThread):
                 second_response = self.session.post(action_url, data=hidden_inputs)
                 second_response.raise_for_status()
 
-                second_soup = BeautifulSoup(second_response.text, "html.parser")
+                second_soup = html_parser.make_soup(second_response.text, parse_only=html_parser.RESERVATION_PAGE)
                 time_slot_cards = second_soup.find_all("div", class_="card card-default")
 
                 if not time_slot_cards:
@@ -1,15 +1,35 @@
 import json
 import os
+import time
 from PyQt6.QtWebEngineCore import QWebEngineCookieStore
 from PyQt6.QtNetwork import QNetworkCookie
-from PyQt6.QtCore import QDateTime, QUrl
+from PyQt6.QtCore import QDateTime, QUrl, QTimer, QCoreApplication
 
 
 class CookieManager:
-    def __init__(self, cookie_file="cookies.json"):
+    """
+    Mirrors the QtWebEngine cookie store into cookies.json. Cookies are kept
+    in a dict keyed by (name, domain, path), and a burst of cookie events
+    during the SSO login is written out once: every change restarts a short
+    debounce timer (bounded by max_delay), and flush() writes immediately,
+    e.g. before the login result is read and when the application quits.
+    """
+
+    def __init__(self, cookie_file="cookies.json", debounce_ms: int = 250, max_delay: float = 2.0):
         self.cookie_file = cookie_file
-        self.cookies = []
+        self.cookies = {}
         self.cookie_store = None
+        self.max_delay = max_delay
+        self._dirty = False
+        self._dirty_since = 0.0
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(debounce_ms)
+        self._save_timer.timeout.connect(self.flush)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush)
         self._clear_cookie_file()
 
     def set_cookie_store(self, cookie_store: QWebEngineCookieStore):
@@ -34,9 +54,10 @@ class CookieManager:
                 'expiry': cookie.expirationDate().toSecsSinceEpoch() if cookie.expirationDate().isValid() else None
             }
 
-            self.cookies = [c for c in self.cookies if not (c['name'] == name and c['domain'] == cookie.domain())]
-            self.cookies.append(cookie_data)
-            self._save_cookies_to_file()
+            key = (name, cookie.domain(), cookie.path())
+            if self.cookies.get(key) != cookie_data:
+                self.cookies[key] = cookie_data
+                self._schedule_save()
 
         except Exception as e:
             print(f"Error processing cookie: {e}")
@@ -44,8 +65,8 @@ class CookieManager:
     def _on_cookie_removed(self, cookie):
         try:
             name = cookie.name().data().decode('utf-8')
-            self.cookies = [c for c in self.cookies if not (c['name'] == name and c['domain'] == cookie.domain())]
-            self._save_cookies_to_file()
+            if self.cookies.pop((name, cookie.domain(), cookie.path()), None) is not None:
+                self._schedule_save()
         except Exception as e:
             print(f"Error removing cookie: {e}")
 
@@ -53,10 +74,10 @@ class CookieManager:
         try:
             if os.path.exists(self.cookie_file):
                 with open(self.cookie_file, "r") as file:
-                    self.cookies = json.load(file)
+                    self.cookies = {(c['name'], c['domain'], c['path']): c for c in json.load(file)}
 
                 if self.cookie_store:
-                    for cookie_data in self.cookies:
+                    for cookie_data in self.cookies.values():
                         qt_cookie = QNetworkCookie(
                             cookie_data['name'].encode(),
                             cookie_data['value'].encode()
@@ -78,17 +99,33 @@ class CookieManager:
         except Exception as e:
             print(f"Error loading cookies: {e}")
 
+    def flush(self):
+        """Writes pending cookie changes right away."""
+        self._save_timer.stop()
+        if self._dirty:
+            self._dirty = False
+            self._save_cookies_to_file()
+
+    def _schedule_save(self):
+        now = time.monotonic()
+        if not self._dirty:
+            self._dirty = True
+            self._dirty_since = now
+        # Each change postpones the write, but a steady stream of changes not for longer than max_delay.
+        if not self._save_timer.isActive() or now - self._dirty_since < self.max_delay:
+            self._save_timer.start()
+
     def _save_cookies_to_file(self):
-        try:
-            with open(self.cookie_file, "w") as file:
-                json.dump(self.cookies, file, indent=4)
-        except Exception as e:
-            print(f"Error saving cookies: {e}")
+        self._write(list(self.cookies.values()))
 
     def _clear_cookie_file(self):
+        self._write([])
+
+    def _write(self, cookies):
+        temp_file = self.cookie_file + ".tmp"
         try:
-            with open(self.cookie_file, "w") as file:
-                json.dump([], file, indent=4)
+            with open(temp_file, "w") as file:
+                json.dump(cookies, file)
+            os.replace(temp_file, self.cookie_file)
         except Exception as e:
-            print(f"Error clearing cookie file: {e}")
-
+            print(f"Error saving cookies: {e}")
@@ -0,0 +1,33 @@
+from datetime import datetime
+from functools import lru_cache
+
+# Formats used by moj.tvz.hr and the local calendar.
+FILE_DATE_FORMAT = "%d.%m.%y"
+NOTIFICATION_TIME_FORMAT = "%d.%m.%Y u %Hh"
+EVENT_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Sort key of values that could not be parsed, orders them before everything else like datetime.min.
+MISSING_SORT_KEY = 0
+
+
+@lru_cache(maxsize=4096)
+def parse(value: str, date_format: str):
+    """
+    Parses a TVZ date string, returns None if it does not match the format.
+    The same strings come back on every polling cycle, so results are memoized.
+    """
+    try:
+        return datetime.strptime(value, date_format)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_sort_key(value: datetime) -> int:
+    """Seconds since 0001-01-01, an integer that orders like the naive datetime itself."""
+    if value is None:
+        return MISSING_SORT_KEY
+    return value.toordinal() * 86400 + value.hour * 3600 + value.minute * 60 + value.second
+
+
+def sort_key(value: str, date_format: str) -> int:
+    return to_sort_key(parse(value, date_format))
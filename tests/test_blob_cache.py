@@ -0,0 +1,67 @@
+import os
+import types
+
+import pytest
+
+from src.tvz_enhancer.data import blob_cache
+from src.tvz_enhancer.data.blob_cache import BlobCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(blob_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def store(cache, clock, tmp_path, key, body):
+    clock[0] += 1
+    source = tmp_path / f"source{key.replace('/', '_')}.pdf"
+    source.write_bytes(body)
+    return cache.store(key, str(source), "predavanje.pdf", version="01.10.24")
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path, clock):
+    """Test to ensure the blobs stay within max_bytes by evicting the least recently used entries first."""
+    cache = BlobCache(str(tmp_path / "cache"), max_bytes=250)
+    store(cache, clock, tmp_path, "/1", b"a" * 100)
+    store(cache, clock, tmp_path, "/2", b"b" * 100)
+    clock[0] += 1
+    assert cache.lookup("/1") is not None
+
+    blob = store(cache, clock, tmp_path, "/3", b"c" * 100)
+
+    assert os.path.exists(blob)
+    assert cache.lookup("/2") is None
+    assert cache.lookup("/1") is not None
+    assert cache.total_size() == 200
+
+
+def test_lookup_without_touch_does_not_refresh_entry(tmp_path, clock):
+    """Test to ensure revalidation lookups (touch=False) do not keep an entry from being evicted."""
+    cache = BlobCache(str(tmp_path / "cache"), max_bytes=250)
+    store(cache, clock, tmp_path, "/1", b"a" * 100)
+    store(cache, clock, tmp_path, "/2", b"b" * 100)
+    clock[0] += 1
+    accessed = cache.lookup("/1", touch=False)['last_access']
+
+    assert cache.lookup("/1", touch=False)['last_access'] == accessed
+    assert cache.request_headers("/1") == {}
+    store(cache, clock, tmp_path, "/3", b"c" * 100)
+
+    assert cache.lookup("/1", touch=False) is None
+    assert cache.lookup("/2", touch=False) is not None
+
+
+def test_identical_content_counts_once_and_oversized_file_is_not_kept(tmp_path, clock):
+    """Test to ensure shared blobs count once against the budget and a file larger than it is evicted at once."""
+    cache = BlobCache(str(tmp_path / "cache"), max_bytes=150)
+    store(cache, clock, tmp_path, "/1", b"a" * 100)
+    store(cache, clock, tmp_path, "/2", b"a" * 100)
+
+    assert cache.total_size() == 100
+    assert cache.lookup("/1")['path'] == cache.lookup("/2")['path']
+
+    assert store(cache, clock, tmp_path, "/3", b"c" * 200) is None
+    assert cache.lookup("/3") is None
+    assert cache.total_size() == 0
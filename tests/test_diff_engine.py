@@ -0,0 +1,32 @@
+from src.tvz_enhancer.data.diff_engine import DiffEngine, ADDED, CHANGED, REMOVED, FILE, NOTIFICATION
+from src.tvz_enhancer.data.records import FileRecord, NotificationRecord
+
+
+def file(extension, date="01.10.24"):
+    return FileRecord(f"Datoteka {extension}", extension, "pdf", date, "Predavanja")
+
+
+def test_diff_files():
+    """Test to ensure a new scrape of a course is turned into added, changed and removed events."""
+    engine = DiffEngine()
+    assert [event.kind for event in engine.diff_files("A", [file("/1"), file("/2")])] == [ADDED, ADDED]
+
+    events = engine.diff_files("A", [file("/1", "02.10.24"), file("/3")])
+
+    assert sorted((event.kind, event.item.extension) for event in events) == \
+        [(ADDED, "/3"), (CHANGED, "/1"), (REMOVED, "/2")]
+
+
+def test_retain_courses_removes_dropped_courses():
+    """Test to ensure a course that left the course list is removed with all its files and notifications."""
+    engine = DiffEngine()
+    engine.diff_files("Old", [file("/1"), file("/2")])
+    engine.diff_notifications("Old", [NotificationRecord("Obavijest", "Poruka", "1.10.2024 u 10h")])
+    engine.diff_files("New", [file("/3")])
+
+    events = engine.retain_courses(["New"])
+
+    assert sorted((event.kind, event.entity, event.course) for event in events) == \
+        [(REMOVED, FILE, "Old"), (REMOVED, FILE, "Old"), (REMOVED, NOTIFICATION, "Old")]
+    assert list(engine.snapshot()) == ["New"]
+    assert engine.retain_courses(["New"]) == []
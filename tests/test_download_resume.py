@@ -0,0 +1,214 @@
+import http.server
+import os
+import re
+import socket
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from src.tvz_enhancer.data import partial_downloads
+from src.tvz_enhancer.data.blob_cache import BlobCache
+from src.tvz_enhancer.data.download_manager import DownloadManager, FINISHED, FAILED, DONE_STATES, WAITING_FOR_PATH
+from src.tvz_enhancer.data.partial_downloads import PendingRegistry
+from src.tvz_enhancer.data.request_executor import RequestExecutor
+from src.tvz_enhancer.data.session_provider import SessionProvider
+
+ETAG = '"v1"'
+
+
+class _RangeHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves body with Range, If-Range and If-None-Match support, cutting the
+    connection after drop_after bytes once. Answers 404 while missing is set.
+    """
+    protocol_version = "HTTP/1.1"
+    body = b""
+    drop_after = None
+    missing = False
+    requests = []
+    paths = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        _RangeHandler.requests.append((range_header, self.headers.get("If-Range")))
+        _RangeHandler.paths.append(self.path)
+
+        if _RangeHandler.missing:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+
+        start = 0
+        if range_header and self.headers.get("If-Range") in (None, ETAG):
+            start = int(re.match(r"bytes=(\d+)-", range_header).group(1))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(self.body) - 1}/{len(self.body)}")
+        else:
+            self.send_response(200)
+        body = self.body[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+
+        if _RangeHandler.drop_after is not None:
+            self.wfile.write(body[:_RangeHandler.drop_after])
+            self.wfile.flush()
+            _RangeHandler.drop_after = None
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _RangeHandler.body = os.urandom(300000)
+    _RangeHandler.drop_after = None
+    _RangeHandler.missing = False
+    _RangeHandler.requests = []
+    _RangeHandler.paths = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/file"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    handle = SessionProvider(cookie_file=str(tmp_path / "cookies.json")).handle("download")
+    manager = DownloadManager(RequestExecutor(lambda: handle), lambda response, filename: filename,
+                              pending=PendingRegistry(str(tmp_path / "pending_downloads.json")),
+                              cache=BlobCache(str(tmp_path / "file_cache")))
+    yield manager
+    manager.shutdown()
+
+
+def wait_for_state(manager, job_id, states, timeout=15):
+    deadline = time.monotonic() + timeout
+    while manager.job(job_id).state not in states:
+        assert time.monotonic() < deadline, f"download did not reach {states}"
+        time.sleep(0.05)
+    return manager.job(job_id)
+
+
+def wait_until_done(manager, job_id, timeout=15):
+    return wait_for_state(manager, job_id, DONE_STATES, timeout)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_resumes_with_range_after_cut_connection(server, manager, tmp_path):
+    """Test to ensure a connection cut mid-body is continued with a Range request instead of starting over."""
+    save_path = str(tmp_path / "predavanje.pdf")
+    partial_downloads.save_manifest(save_path, server, 0)
+    manager.pending.add(save_path)
+    _RangeHandler.drop_after = 100000
+
+    job_id, = manager.resume_pending()
+    job = wait_until_done(manager, job_id)
+
+    assert job.state == FINISHED
+    assert read(save_path) == _RangeHandler.body
+    assert _RangeHandler.requests == [(None, None), ("bytes=100000-", ETAG)]
+    assert not os.path.exists(partial_downloads.part_path(save_path))
+    assert not os.path.exists(partial_downloads.manifest_path(save_path))
+    assert manager.pending.entries() == []
+
+
+def test_resumes_preallocated_file_after_crash(server, manager, tmp_path):
+    """Test to ensure resume_pending continues at the checkpoint of a preallocated .part file."""
+    save_path = str(tmp_path / "predavanje.pdf")
+    body = _RangeHandler.body
+    # What a crashed run leaves behind: the file at its full size, only the first 123456 bytes written.
+    with open(partial_downloads.part_path(save_path), "wb") as f:
+        f.write(body[:123456])
+        f.truncate(len(body))
+    partial_downloads.save_manifest(save_path, server, len(body), ETAG, written=123456)
+    manager.pending.add(save_path)
+
+    job_id, = manager.resume_pending()
+    job = wait_until_done(manager, job_id)
+
+    assert job.state == FINISHED
+    assert read(save_path) == body
+    assert _RangeHandler.requests == [("bytes=123456-", ETAG)]
+    assert manager.pending.entries() == []
+
+
+def test_resume_rebuilds_url_with_current_session(server, manager, tmp_path):
+    """Test to ensure a download started before a new login resumes with a url built from the current state."""
+    save_path = str(tmp_path / "predavanje.pdf")
+    body = _RangeHandler.body
+    with open(partial_downloads.part_path(save_path), "wb") as f:
+        f.write(body[:100000])
+    partial_downloads.save_manifest(save_path, server + "?TVZ=old", len(body), ETAG, written=100000,
+                                    key="/4100/1", version="01.10.24")
+    manager.pending.add(save_path)
+    manager.url_for = lambda key: f"{server}?TVZ=new&link=skini/repoz{key}"
+
+    job_id, = manager.resume_pending()
+    job = wait_until_done(manager, job_id)
+
+    assert job.state == FINISHED, job.error
+    assert read(save_path) == body
+    assert _RangeHandler.paths == ["/file?TVZ=new&link=skini/repoz/4100/1"]
+    assert _RangeHandler.requests == [("bytes=100000-", ETAG)]
+
+
+def test_discards_partial_download_the_server_refuses(server, manager, tmp_path):
+    """Test to ensure a 404 drops the .part file and the pending entry instead of retrying on every start."""
+    save_path = str(tmp_path / "predavanje.pdf")
+    with open(partial_downloads.part_path(save_path), "wb") as f:
+        f.write(_RangeHandler.body[:1000])
+    partial_downloads.save_manifest(save_path, server, len(_RangeHandler.body), ETAG, written=1000)
+    manager.pending.add(save_path)
+    _RangeHandler.missing = True
+
+    job_id, = manager.resume_pending()
+    job = wait_until_done(manager, job_id)
+
+    assert job.state == FAILED
+    assert not os.path.exists(partial_downloads.part_path(save_path))
+    assert not os.path.exists(partial_downloads.manifest_path(save_path))
+    assert manager.pending.entries() == []
+
+
+def test_downloads_again_when_cached_blob_is_gone(server, manager, tmp_path):
+    """Test to ensure a cache hit whose blob disappears before the save path is chosen falls back to a GET."""
+    body = _RangeHandler.body
+    cached = tmp_path / "cached.pdf"
+    cached.write_bytes(body)
+    blob_path = manager.cache.store("/4100/1", str(cached), "predavanje.pdf", "01.10.24", ETAG)
+
+    job_id = manager.enqueue(server, "predavanje.pdf", "/4100/1", "01.10.24")
+    job = wait_for_state(manager, job_id, (WAITING_FOR_PATH,) + DONE_STATES)
+    assert job.state == WAITING_FOR_PATH and job.from_cache
+
+    # Evicted while the save dialog is open.
+    os.remove(blob_path)
+    save_path = str(tmp_path / "predavanje.pdf")
+    manager.set_save_path(job_id, save_path)
+    job = wait_until_done(manager, job_id)
+
+    assert job.state == FINISHED, job.error
+    assert read(save_path) == body
+    assert _RangeHandler.requests == [(None, None), (None, None)]
+    assert manager.pending.entries() == []
+    assert manager.cache.lookup("/4100/1", "01.10.24") is not None
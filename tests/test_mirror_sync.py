@@ -0,0 +1,246 @@
+import io
+import json
+import os
+
+import pytest
+import requests
+
+from src.tvz_enhancer.data.mirror_sync import MirrorSync, MANIFEST_NAME, ARCHIVE_DIR, DELETE
+from src.tvz_enhancer.data.records import FileRecord
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self.headers = {'Content-Length': str(len(body))}
+        self.raw = io.BytesIO(body)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.raw.close()
+
+
+class FakeExecutor:
+    """Serves the bodies of repository ids from memory, like RequestExecutor.get against moj.tvz.hr."""
+
+    def __init__(self):
+        self.bodies = {}
+        self.requested = []
+
+    def get(self, url, endpoint="page", **kwargs):
+        self.requested.append(url)
+        body = self.bodies.get(url)
+        return FakeResponse(b"", 404) if body is None else FakeResponse(body)
+
+
+def file(extension, date="01.10.24", section="Predavanja", name=None):
+    return FileRecord(name or f"Datoteka{extension.replace('/', '_')}.pdf", extension, "pdf", date, section)
+
+
+def url_for(extension):
+    return "https://moj.tvz.hr/index.php?link=skini/repoz" + extension
+
+
+@pytest.fixture
+def executor():
+    return FakeExecutor()
+
+
+def mirror(executor, target, **kwargs):
+    return MirrorSync(executor, url_for, lambda response, filename: filename, str(target), **kwargs)
+
+
+def publish(executor, record, body):
+    executor.bodies[url_for(record.extension)] = body
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def manifest(target):
+    with open(os.path.join(target, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)["entries"]
+
+
+def archived(target):
+    archive_root = os.path.join(target, ARCHIVE_DIR)
+    if not os.path.isdir(archive_root):
+        return []
+    return sorted(os.path.relpath(os.path.join(root, name), archive_root).split(os.sep, 1)[1]
+                  for root, _, names in os.walk(archive_root) for name in names)
+
+
+def test_first_sync_downloads_everything_and_second_sync_nothing(executor, tmp_path):
+    """Test to ensure only downloadable files are mirrored and an unchanged repository is not fetched again."""
+    lecture, exercise = file("/1/10"), file("/1/11", section="Vježbe")
+    link = FileRecord("Vanjski link", "https://example.com", "link", "01.10.24", "Predavanja")
+    publish(executor, lecture, b"predavanje")
+    publish(executor, exercise, b"vjezba")
+    course_files = {"Programiranje": [lecture, exercise, link]}
+
+    result = mirror(executor, tmp_path).sync(course_files)
+
+    assert (result.added, result.updated, result.removed, result.unchanged, result.failed) == (2, 0, 0, 0, 0)
+    assert read(tmp_path / "Programiranje" / "Predavanja" / lecture.name) == b"predavanje"
+    assert read(tmp_path / "Programiranje" / "Vježbe" / exercise.name) == b"vjezba"
+    assert manifest(tmp_path)["/1/10"]["version"] == "01.10.24"
+
+    executor.requested.clear()
+    result = mirror(executor, tmp_path).sync(course_files)
+
+    assert (result.added, result.updated, result.unchanged) == (0, 0, 2)
+    assert executor.requested == []
+
+
+def test_changed_file_is_updated_in_place_and_old_version_archived(executor, tmp_path):
+    """Test to ensure a new version replaces the file at the same path and the previous one goes to .archive."""
+    lecture = file("/1/10")
+    publish(executor, lecture, b"v1")
+    mirror(executor, tmp_path).sync({"Programiranje": [lecture]})
+
+    changed = file("/1/10", date="05.10.24")
+    publish(executor, changed, b"v2")
+    result = mirror(executor, tmp_path).sync({"Programiranje": [changed]})
+
+    relative_path = os.path.join("Programiranje", "Predavanja", lecture.name)
+    assert (result.added, result.updated) == (0, 1)
+    assert read(tmp_path / relative_path) == b"v2"
+    assert manifest(tmp_path)["/1/10"]["path"] == relative_path
+    assert archived(tmp_path) == [relative_path]
+
+
+def test_changed_file_with_delete_keeps_no_old_version(executor, tmp_path):
+    lecture = file("/1/10")
+    publish(executor, lecture, b"v1")
+    mirror(executor, tmp_path, removed=DELETE).sync({"Programiranje": [lecture]})
+
+    changed = file("/1/10", date="05.10.24")
+    publish(executor, changed, b"v2")
+    mirror(executor, tmp_path, removed=DELETE).sync({"Programiranje": [changed]})
+
+    assert read(tmp_path / "Programiranje" / "Predavanja" / lecture.name) == b"v2"
+    assert archived(tmp_path) == []
+
+
+def test_removed_files_are_archived_or_deleted(executor, tmp_path):
+    """Test to ensure a file removed from its course is archived (deleted with --delete), other courses untouched."""
+    kept, removed, other = file("/1/10"), file("/1/11"), file("/2/20")
+    for record in (kept, removed, other):
+        publish(executor, record, b"x")
+    mirror(executor, tmp_path).sync({"Programiranje": [kept, removed], "Matematika": [other]})
+
+    # Matematika could not be scraped this time, so it is left alone.
+    result = mirror(executor, tmp_path).sync({"Programiranje": [kept]})
+
+    assert result.removed == 1
+    assert archived(tmp_path) == [os.path.join("Programiranje", "Predavanja", removed.name)]
+    assert not os.path.exists(tmp_path / "Programiranje" / "Predavanja" / removed.name)
+    assert os.path.exists(tmp_path / "Matematika" / "Predavanja" / other.name)
+    assert sorted(manifest(tmp_path)) == ["/1/10", "/2/20"]
+
+    result = mirror(executor, tmp_path, removed=DELETE).sync({"Programiranje": [], "Matematika": [other]})
+
+    assert result.removed == 1
+    assert not os.path.exists(tmp_path / "Programiranje")
+    assert len(archived(tmp_path)) == 1
+
+
+def test_verify_refetches_missing_or_truncated_files(executor, tmp_path):
+    lecture, exercise = file("/1/10"), file("/1/11")
+    publish(executor, lecture, b"predavanje")
+    publish(executor, exercise, b"vjezba")
+    course_files = {"Programiranje": [lecture, exercise]}
+    mirror(executor, tmp_path).sync(course_files)
+
+    os.remove(tmp_path / "Programiranje" / "Predavanja" / lecture.name)
+    with open(tmp_path / "Programiranje" / "Predavanja" / exercise.name, "wb") as f:
+        f.write(b"vj")
+
+    assert mirror(executor, tmp_path).sync(course_files).unchanged == 2
+
+    result = mirror(executor, tmp_path).sync(course_files, verify=True)
+
+    assert (result.updated, result.unchanged) == (2, 0)
+    assert read(tmp_path / "Programiranje" / "Predavanja" / lecture.name) == b"predavanje"
+    assert read(tmp_path / "Programiranje" / "Predavanja" / exercise.name) == b"vjezba"
+
+
+def test_cancel_stops_transfers_and_next_sync_continues(executor, tmp_path):
+    """Test to ensure a cancelled sync leaves no .part files and a manifest the next run continues from."""
+    records = [file(f"/1/{i}") for i in range(5)]
+    for record in records:
+        publish(executor, record, b"x" * 1000)
+    sync = mirror(executor, tmp_path, max_workers=1)
+
+    sync.sync({"Programiranje": records}, progress=lambda *args: sync.cancel())
+
+    entries = manifest(tmp_path)
+    assert 1 <= len(entries) < len(records)
+    assert all(os.path.exists(tmp_path / entry["path"]) for entry in entries.values())
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".part")]
+
+    result = mirror(executor, tmp_path).sync({"Programiranje": records})
+
+    assert (result.added, result.unchanged, result.failed) == (len(records) - len(entries), len(entries), 0)
+
+
+def test_failed_file_is_reported_and_not_recorded(executor, tmp_path):
+    missing = file("/1/10")
+    result = mirror(executor, tmp_path).sync({"Programiranje": [missing]})
+
+    assert result.failed == 1
+    assert manifest(tmp_path) == {}
+    assert not os.path.exists(tmp_path / "Programiranje" / "Predavanja" / missing.name)
+
+
+def test_command_line_passes_delete_verify_and_course(executor, tmp_path, monkeypatch):
+    """Test to ensure sync.py mirrors only the chosen courses with the --delete and --verify options."""
+    pytest.importorskip("PyQt6")
+    from src.tvz_enhancer import sync
+
+    lecture, other = file("/1/10"), file("/2/20")
+    publish(executor, lecture, b"predavanje")
+    publish(executor, other, b"matematika")
+
+    class FakeDataApi:
+        state = "MOJX"
+
+        def __init__(self):
+            self.executor = executor
+            self.download_url = url_for
+            self.stopped = False
+
+        def ensure_session(self):
+            pass
+
+        def determine_filename(self, response, filename):
+            return filename
+
+        def get_course_info(self):
+            return {"Programiranje": [lecture], "Matematika": [other]}, {}, {}
+
+        def stop(self):
+            self.stopped = True
+
+    calls = []
+    original_sync = sync.MirrorSync.sync
+
+    def recording_sync(self, course_files, verify=False, progress=None):
+        calls.append((self.removed, verify, sorted(course_files)))
+        return original_sync(self, course_files, verify, progress)
+
+    monkeypatch.setattr(sync, "DataApiThread", FakeDataApi)
+    monkeypatch.setattr(sync.MirrorSync, "sync", recording_sync)
+
+    assert sync.main([str(tmp_path), "--course", "Programiranje", "--delete", "--verify"]) == 0
+    assert calls == [(DELETE, True, ["Programiranje"])]
+    assert read(tmp_path / "Programiranje" / "Predavanja" / lecture.name) == b"predavanje"
+    assert not os.path.exists(tmp_path / "Matematika")
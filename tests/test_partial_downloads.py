@@ -0,0 +1,73 @@
+import os
+
+from src.tvz_enhancer.data import partial_downloads
+from src.tvz_enhancer.data.download_writer import PreallocatedWriter
+from src.tvz_enhancer.data.partial_downloads import PendingRegistry
+
+URL = "https://moj.tvz.hr/index.php?link=skini/repoz/4100/1"
+
+
+def test_resume_offset_after_crash_with_preallocated_file(tmp_path):
+    """Test to ensure a crash mid-download resumes at the last checkpoint, not at the preallocated size."""
+    save_path = str(tmp_path / "predavanje.pdf")
+    partial_downloads.save_manifest(save_path, URL, 1000, '"v1"')
+
+    # The process dies without closing the writer, so the .part file keeps its preallocated size.
+    writer = PreallocatedWriter(partial_downloads.part_path(save_path), 0, 1000,
+                                on_checkpoint=lambda written: partial_downloads.checkpoint(save_path, written),
+                                checkpoint_bytes=256)
+    writer._write(b"x" * 300)
+    writer._write(b"y" * 300)
+    writer._file.flush()
+
+    assert os.path.getsize(partial_downloads.part_path(save_path)) == 1000
+    assert partial_downloads.resume_offset(save_path, URL) == 600
+    writer._file.close()
+
+
+def test_resume_offset_without_usable_partial_download(tmp_path):
+    """Test to ensure nothing is resumed without a manifest, for another url or without a .part file."""
+    save_path = str(tmp_path / "predavanje.pdf")
+    with open(partial_downloads.part_path(save_path), "wb") as f:
+        f.write(b"x" * 100)
+    assert partial_downloads.resume_offset(save_path, URL) == 0
+
+    partial_downloads.save_manifest(save_path, URL, 1000, written=100)
+    assert partial_downloads.resume_offset(save_path, URL + "0") == 0
+    assert partial_downloads.resume_offset(save_path, URL) == 100
+
+    os.remove(partial_downloads.part_path(save_path))
+    assert partial_downloads.resume_offset(save_path, URL) == 0
+
+
+def test_pending_registry(tmp_path):
+    """Test to ensure the registry keeps every unfinished save path once and survives a corrupt file."""
+    path = str(tmp_path / "pending_downloads.json")
+    registry = PendingRegistry(path)
+    assert registry.entries() == []
+
+    registry.add("a.pdf")
+    registry.add("b.pdf")
+    registry.add("a.pdf")
+    assert PendingRegistry(path).entries() == ["a.pdf", "b.pdf"]
+
+    registry.remove("a.pdf")
+    registry.remove("missing.pdf")
+    assert registry.entries() == ["b.pdf"]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert registry.entries() == []
+    registry.add("c.pdf")
+    assert registry.entries() == ["c.pdf"]
+
+
+def test_resume_offset_matches_key_after_new_login(tmp_path):
+    """Test to ensure a partial download is found by its repository id when the session in its url changed."""
+    save_path = str(tmp_path / "predavanje.pdf")
+    with open(partial_downloads.part_path(save_path), "wb") as f:
+        f.write(b"x" * 100)
+    partial_downloads.save_manifest(save_path, URL + "&TVZ=old", 1000, written=100, key="/4100/1")
+
+    assert partial_downloads.resume_offset(save_path, URL + "&TVZ=new", "/4100/1") == 100
+    assert partial_downloads.resume_offset(save_path, URL + "&TVZ=new", "/4100/2") == 0
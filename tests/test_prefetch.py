@@ -0,0 +1,103 @@
+import itertools
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from src.tvz_enhancer.data.diff_engine import ChangeEvent, ADDED, FILE
+from src.tvz_enhancer.data.download_manager import FINISHED
+from src.tvz_enhancer.data.prefetch import PrefetchPolicy
+from src.tvz_enhancer.data.records import FileRecord
+
+
+class FakeSignal:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+class FakeJob:
+    def __init__(self, job_id, cache_key):
+        self.id = job_id
+        self.cache_key = cache_key
+        self.into_cache = True
+
+
+class FakeDownloadManager:
+    def __init__(self):
+        self.job_state_changed = FakeSignal()
+        self.jobs = {}
+        self.promoted = []
+        self._ids = itertools.count(1)
+
+    def enqueue_to_cache(self, url, filename, cache_key, cache_version=None, **kwargs):
+        job = FakeJob(next(self._ids), cache_key)
+        self.jobs[job.id] = job
+        return job.id
+
+    def active_jobs(self):
+        return list(self.jobs.values())
+
+    def promote(self, job_id):
+        self.promoted.append(job_id)
+
+    def finish(self, job_id):
+        del self.jobs[job_id]
+        self.job_state_changed.emit(job_id, FINISHED)
+
+
+class FakeCache:
+    def total_size(self):
+        return 0
+
+    def lookup(self, key, version=None, touch=True):
+        return None
+
+
+def added(*extensions):
+    return [ChangeEvent(ADDED, FILE, "A", extension,
+                        FileRecord(f"Datoteka {extension}", extension, "pdf", "01.10.24", "Predavanja"), None)
+            for extension in extensions]
+
+
+@pytest.fixture
+def manager():
+    return FakeDownloadManager()
+
+
+@pytest.fixture
+def policy(manager):
+    return PrefetchPolicy(manager, FakeCache(), lambda extension: f"https://moj.tvz.hr/{extension}", enabled=True)
+
+
+def test_take_over_promotes_running_prefetch(policy, manager):
+    """Test to ensure opening a file that is being prefetched reuses and unthrottles that job."""
+    policy.on_changes(added("/1"))
+
+    assert policy.take_over("/1") == 1
+    assert manager.promoted == [1]
+
+
+def test_take_over_removes_queued_file(policy, manager):
+    """Test to ensure a queued file that the user opened is not prefetched a second time."""
+    policy.on_changes(added("/1", "/2", "/3"))
+    assert policy.take_over("/2") is None
+    manager.enqueue_to_cache("https://moj.tvz.hr//2", "Datoteka /2", "/2")
+
+    manager.finish(1)
+
+    assert [job.cache_key for job in manager.active_jobs()] == ["/2", "/3"]
+
+
+def test_skips_files_with_an_active_cache_download(policy, manager):
+    """Test to ensure a prefetch never writes the staging file of a cache download that is already running."""
+    manager.enqueue_to_cache("https://moj.tvz.hr//5", "Datoteka /5", "/5")
+    policy.on_changes(added("/5", "/6"))
+
+    assert [job.cache_key for job in manager.active_jobs()] == ["/5", "/6"]
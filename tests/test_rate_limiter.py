@@ -0,0 +1,77 @@
+import threading
+import time
+import types
+
+from src.tvz_enhancer.data import rate_limiter
+from src.tvz_enhancer.data.rate_limiter import RateLimiter, RESERVATION, INTERACTIVE, POLL, PREFETCH
+
+
+def wait_for_waiters(limiter, priority, count=1):
+    deadline = time.monotonic() + 5
+    while limiter._waiting[priority] < count:
+        assert time.monotonic() < deadline, "the waiter never blocked"
+        time.sleep(0.005)
+
+
+def test_tokens_refill_at_rate_up_to_burst(monkeypatch):
+    """Test to ensure a drained bucket refills at the configured rate and never beyond the burst."""
+    now = [100.0]
+    monkeypatch.setattr(rate_limiter, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    limiter = RateLimiter(rate=2, burst=3)
+
+    assert [limiter.acquire(timeout=0) for _ in range(4)] == [True, True, True, False]
+
+    now[0] += 0.5
+    assert [limiter.acquire(timeout=0) for _ in range(2)] == [True, False]
+
+    now[0] += 60
+    assert [limiter.acquire(timeout=0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_waiters_are_served_by_priority():
+    """Test to ensure waiting callers get tokens by priority class regardless of when they started waiting."""
+    limiter = RateLimiter(rate=20, burst=1)
+    assert limiter.acquire()
+    served = []
+    threads = []
+    for priority in (PREFETCH, POLL, INTERACTIVE):
+        thread = threading.Thread(target=lambda p=priority: limiter.acquire(p) and served.append(p))
+        thread.start()
+        wait_for_waiters(limiter, priority)
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join(5)
+    assert served == [INTERACTIVE, POLL, PREFETCH]
+
+
+def test_reservation_window_holds_back_poll_and_prefetch():
+    """Test to ensure polling and prefetching wait out a reservation window while reservations go first."""
+    limiter = RateLimiter(rate=20, burst=1)
+    limiter.open_window(30)
+
+    assert not limiter.acquire(POLL, timeout=0.05)
+    assert not limiter.acquire(PREFETCH, timeout=0.05)
+    assert limiter.acquire(INTERACTIVE, timeout=0)
+    # Reservations borrow against the empty bucket instead of waiting for a token.
+    assert limiter.acquire(RESERVATION, timeout=0)
+
+    served = []
+    poll = threading.Thread(target=lambda: served.append(limiter.acquire(POLL)))
+    poll.start()
+    wait_for_waiters(limiter, POLL)
+    assert limiter.window_open() and served == []
+
+    limiter.close_window()
+    poll.join(5)
+    assert served == [True]
+
+
+def test_cancelled_waiter_gives_up():
+    """Test to ensure a caller waiting for a token returns False once it is cancelled."""
+    limiter = RateLimiter(rate=0.01, burst=1)
+    assert limiter.acquire()
+    cancelled = threading.Event()
+    cancelled.set()
+
+    assert not limiter.acquire(POLL, cancelled=cancelled)
@@ -0,0 +1,206 @@
+import threading
+
+import pytest
+import requests
+
+from src.tvz_enhancer.data import request_executor
+from src.tvz_enhancer.data.rate_limiter import RateLimitTimeoutError
+from src.tvz_enhancer.data.request_executor import (RequestExecutor, RetryPolicy, CircuitBreaker, CircuitOpenError,
+                                                    DeadlineExceededError, DEFAULT_POLICIES)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Answers each request with the next outcome: a status code or an exception to raise."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, priority=None, wait=None, cancelled=None, **kwargs):
+        self.calls.append(kwargs['timeout'])
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def executor(session, clock, **policies):
+    return RequestExecutor(lambda: session, CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=clock),
+                           policies, clock=clock)
+
+
+def policy(**kwargs):
+    kwargs.setdefault("base_delay", 0)
+    return RetryPolicy(**kwargs)
+
+
+def test_retries_server_errors_and_connection_errors(clock):
+    """Test to ensure retryable statuses and connection errors are retried until the request succeeds."""
+    session = FakeSession(503, requests.ConnectionError("reset"), 200)
+    response = executor(session, clock, page=policy(retries=2)).get("https://moj.tvz.hr/")
+
+    assert response.status_code == 200
+    assert len(session.calls) == 3
+
+
+def test_gives_up_after_the_last_retry(clock):
+    """Test to ensure the last error is raised once the retries are used up and other statuses are not retried."""
+    session = FakeSession(500, 502)
+    with pytest.raises(requests.HTTPError) as error:
+        executor(session, clock, page=policy(retries=1)).get("https://moj.tvz.hr/")
+    assert error.value.response.status_code == 502
+    assert error.value.response.closed
+
+    session = FakeSession(404)
+    assert executor(session, clock, page=policy(retries=3)).get("https://moj.tvz.hr/").status_code == 404
+    assert len(session.calls) == 1
+
+
+def test_backoff_is_capped_exponential_with_full_jitter(monkeypatch):
+    """Test to ensure the backoff doubles per attempt up to max_delay and is jittered from zero."""
+    monkeypatch.setattr(request_executor.random, "uniform", lambda low, high: (low, high))
+    retry = RetryPolicy(base_delay=0.5, max_delay=3)
+
+    assert [retry.backoff(attempt) for attempt in range(4)] == [(0, 0.5), (0, 1.0), (0, 2.0), (0, 3)]
+
+
+def test_cycle_deadline_limits_timeout_and_retries(clock):
+    """Test to ensure polling requests never outlive the cycle budget and give up instead of backing off past it."""
+    retry = policy(retries=3, timeout=10)
+    retry.backoff = lambda attempt: 5
+    session = FakeSession(503)
+    api = executor(session, clock, page=retry)
+    api.start_cycle(3)
+
+    with pytest.raises(requests.HTTPError):
+        api.get("https://moj.tvz.hr/")
+    assert session.calls == [3]
+
+    clock.advance(4)
+    with pytest.raises(DeadlineExceededError):
+        api.get("https://moj.tvz.hr/")
+
+    api.end_cycle()
+    session = FakeSession(200)
+    executor(session, clock, page=retry).get("https://moj.tvz.hr/")
+    assert session.calls == [10]
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout(clock):
+    """Test to ensure repeated failures open the breaker and it lets requests probe after the reset timeout."""
+    session = FakeSession(503, 503)
+    api = executor(session, clock, page=policy(retries=0))
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            api.get("https://moj.tvz.hr/")
+
+    assert api.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        api.get("https://moj.tvz.hr/")
+    assert len(session.calls) == 2
+
+    clock.advance(59)
+    assert api.breaker.remaining_open_time() == pytest.approx(1)
+    clock.advance(1)
+    assert api.breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_failed_probe_doubles_timeout_and_success_closes(clock):
+    """Test to ensure a failed probe reopens the breaker for twice as long and a successful one closes it."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, max_reset_timeout=100, clock=clock)
+    breaker.record_failure()
+    clock.advance(60)
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.remaining_open_time() == 100
+
+    clock.advance(100)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.remaining_open_time() == 60
+
+
+def test_half_open_admits_a_single_probe(clock):
+    """Test to ensure only one request probes a half open host and another may probe once it ended without a verdict."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=clock)
+    breaker.record_failure()
+    clock.advance(60)
+
+    assert breaker.allow_request()
+    # The probe's own retries are let through again.
+    assert breaker.allow_request()
+
+    admitted = []
+    other = threading.Thread(target=lambda: admitted.append(breaker.allow_request()))
+    other.start()
+    other.join()
+    assert admitted == [False]
+
+    breaker.release_probe()
+    other = threading.Thread(target=lambda: admitted.append(breaker.allow_request()))
+    other.start()
+    other.join()
+    assert admitted == [False, True]
+
+
+def test_probe_is_released_when_the_request_says_nothing_about_the_host(clock):
+    """Test to ensure a probe that timed out in the rate limiter or did not trip the breaker frees the half open slot."""
+    session = FakeSession(RateLimitTimeoutError("no slot"), requests.ConnectionError("reset"))
+    api = executor(session, clock, page=policy(retries=0), startup=DEFAULT_POLICIES["startup"])
+    api.breaker.record_failure()
+    api.breaker.record_failure()
+    clock.advance(60)
+
+    with pytest.raises(DeadlineExceededError):
+        api.get("https://moj.tvz.hr/")
+    with pytest.raises(requests.ConnectionError):
+        api.get("https://moj.tvz.hr/", endpoint="startup")
+
+    assert api.breaker.state == CircuitBreaker.HALF_OPEN
+    admitted = []
+    other = threading.Thread(target=lambda: admitted.append(api.breaker.allow_request()))
+    other.start()
+    other.join()
+    assert admitted == [True]
+
+
+def test_startup_policy_does_not_trip_the_breaker(clock):
+    """Test to ensure the index page read while the dashboard is built fails fast without opening the breaker."""
+    session = FakeSession(*[requests.Timeout("slow")] * 3)
+    api = executor(session, clock)
+    for _ in range(3):
+        with pytest.raises(requests.Timeout):
+            api.get("https://moj.tvz.hr/", endpoint="startup")
+
+    assert session.calls == [5, 5, 5]
+    assert api.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,92 @@
+import threading
+import types
+
+import pytest
+
+from src.tvz_enhancer.data import single_flight
+from src.tvz_enhancer.data.single_flight import SingleFlight
+
+
+def run_concurrently(flight, key, fn, count):
+    results = []
+
+    def call():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test to ensure callers arriving while the same key is in flight wait for and share its result."""
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "stranica"
+
+    leader, results = run_concurrently(flight, "index", fetch, 1)
+    assert started.wait(5)
+    followers, follower_results = run_concurrently(flight, "index", fetch, 4)
+    followers[0].join(0.1)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results + follower_results == ["stranica"] * 5
+    assert flight.do("other", lambda: "druga") == "druga"
+
+
+def test_result_is_reused_until_ttl_expires(monkeypatch):
+    """Test to ensure a finished result answers new callers for ttl seconds and forget drops it early."""
+    now = [100.0]
+    monkeypatch.setattr(single_flight, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    flight = SingleFlight(ttl=2)
+    counter = iter(range(10))
+
+    assert flight.do("index", lambda: next(counter)) == 0
+    now[0] += 1.9
+    assert flight.do("index", lambda: next(counter)) == 0
+    now[0] += 0.1
+    assert flight.do("index", lambda: next(counter)) == 1
+
+    flight.forget("index")
+    assert flight.do("index", lambda: next(counter)) == 2
+    flight.forget()
+    assert flight.do("index", lambda: next(counter)) == 3
+
+
+def test_errors_are_shared_with_waiters_but_not_reused():
+    """Test to ensure concurrent callers get the leader's exception and the next call runs fn again."""
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    error = ConnectionError("moj.tvz.hr")
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise error
+
+    leader, leader_results = run_concurrently(flight, "index", fail, 1)
+    assert started.wait(5)
+    followers, results = run_concurrently(flight, "index", fail, 3)
+    followers[0].join(0.1)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert leader_results == [error]
+    assert results == [error] * 3
+    with pytest.raises(ValueError):
+        flight.do("index", lambda: int("x"))
+    assert flight.do("index", lambda: "ok") == "ok"
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from src.tvz_enhancer.data import extraction, html_parser, stream_parser
+
+COURSE_PAGE = os.path.join(os.path.dirname(__file__), "..", "src", "tvz_enhancer", "benchmarks", "pages",
+                           "course_page.html")
+
+
+@pytest.fixture(scope="module")
+def content():
+    with open(COURSE_PAGE, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def expected(content):
+    """What extraction.extract_course_page finds with the SoupStrainer."""
+    return extraction.extract_course_page(content, "utf-8")
+
+
+def chunked(content, chunk_size):
+    return [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+
+def test_strained_parse_matches_unstrained_parse(content, expected):
+    """Test to ensure the SoupStrainer does not drop anything a full bs4 parse finds."""
+    soup = html_parser.make_soup(content.decode("utf-8"))
+    unstrained = (extraction.extract_files(soup), extraction.extract_notifications(soup),
+                  extraction.extract_reservation_link(soup))
+
+    assert unstrained == expected
+    files, notifications, reservation_link = expected
+    assert len(files) == 800
+    assert len(notifications) == 12
+    assert reservation_link == "https://moj.tvz.hr/rezervacije.php?predmet=SPA"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, None])
+def test_stream_parser_matches_extraction(content, expected, chunk_size):
+    """Test to ensure the stream parser gives the same records for any chunking, including split UTF-8 characters."""
+    chunks = [content] if chunk_size is None else chunked(content, chunk_size)
+
+    assert stream_parser.parse_course_page(chunks, "utf-8") == expected